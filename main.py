@@ -1,19 +1,97 @@
 # main.py
 
 import sys
+import time
 import argparse
 import traceback
 import asyncio
-from fastapi import FastAPI # type: ignore
-from fastapi.responses import RedirectResponse # type: ignore
-import uvicorn # type: ignore
+import multiprocessing
 
-from server.routes import router
+from server.app import create_app
+from server.worker import bind_socket, run_worker
 from server.services.db_service import db_service
 from server.services.session_service import session_service
+from server.services.asset_service import asset_service
+from server.services.snapshot_service import snapshot_service
+from server.services.profiler_service import profiler_service
 from server.services.killswitch_service import KillSwitchService
-from server.middleware import ActivityMiddleware
 from server.config import settings
+from server.security import get_admin_key
+
+def register_session_commands(killswitch: KillSwitchService) -> None:
+    """Operator commands to manage sessions from the terminal."""
+
+    def open_command(args):
+        if len(args) != 3:
+            print("[KillSwitch] Usage: open <course> <batch> <total>")
+            return
+        course, batch, total = args
+        session = session_service.open_session(max_count=int(total), course=course, batch=batch)
+        print(f"[DEBUG] Session opened: {session.table_name} (code {session.code})")
+
+    def close_command(args):
+        if len(args) != 1:
+            print("[KillSwitch] Usage: close <session-code>")
+            return
+        session_service.end_session(args[0])
+        print(f"[DEBUG] Session closed: {args[0]}")
+
+    def sessions_command(args):
+        for s in session_service.sessions():
+            print(f"  {s.code}  {s.table_name}  {s.current_count}/{s.max_count}")
+
+    killswitch.register_command("open", open_command)
+    killswitch.register_command("close", close_command)
+    killswitch.register_command("sessions", sessions_command)
+
+    def next_command(args):
+        if len(args) not in (3, 4):
+            print("[KillSwitch] Usage: next <course> <batch> <total> [session-code-to-close]")
+            return
+        course, batch, total = args[:3]
+        started = time.perf_counter()
+        closed, session = session_service.rollover(
+            max_count=int(total),
+            course=course,
+            batch=batch,
+            close_code=args[3] if len(args) == 4 else None,
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        for s in closed:
+            print(f"[DEBUG] Session closed: {s.table_name} ({s.current_count}/{s.max_count})")
+        print("+------------------------------------------------------------------------------------+")
+        print(f" [DEBUG] Session initialized: {session.table_name} ({elapsed_ms:.1f}ms)")
+        print(f" [DEBUG] Session code (share with students): {session.code}")
+        print("+------------------------------------------------------------------------------------+")
+
+    killswitch.register_command("next", next_command)
+
+
+def register_profile_command(killswitch: KillSwitchService) -> None:
+    """`profile on [sample|cprofile]`, `profile off`, `profile dump [dir]`, `profile status`."""
+
+    def profile_command(args):
+        action = args[0].lower() if args else "status"
+        if action == "on":
+            # Runs on the event loop thread, which is what cProfile instruments
+            profiler_service.start(args[1].lower() if len(args) > 1 else "sample")
+            print(f"[Profiler] Started ({profiler_service.mode}).")
+        elif action == "off":
+            profiler_service.stop()
+            print(f"[Profiler] Stopped: {profiler_service.status()}")
+        elif action == "dump":
+            written = profiler_service.dump(args[1] if len(args) > 1 else None)
+            for path in written:
+                print(f"[Profiler] Wrote {path}")
+            if not written:
+                print("[Profiler] Nothing recorded yet.")
+        elif action == "status":
+            print(f"[Profiler] {profiler_service.status()}")
+        else:
+            print("[KillSwitch] Usage: profile on [sample|cprofile] | off | dump [dir] | status")
+
+    killswitch.register_command("profile", profile_command)
+
 
 def main():
     print("[DEBUG] Starting Presenz backend...")
@@ -22,12 +100,23 @@ def main():
     # Parse CLI arguments
     # -------------------------
     parser = argparse.ArgumentParser(description="Presenz attendance system")
-    parser.add_argument("--course", required=True, help="Course name")
-    parser.add_argument("--batch", required=True, help="Batch ID")
-    parser.add_argument("--total", required=True, type=int, help="Total number of students")
+    parser.add_argument("--course", help="Course name")
+    parser.add_argument("--batch", help="Batch ID")
+    parser.add_argument("--total", type=int, help="Total number of students")
     parser.add_argument("--db", required=False, help="SQLite DB file path")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes")
+    parser.add_argument(
+        "--persistent",
+        action="store_true",
+        help="Stay up across sessions: no idle or capacity shutdown; roll over with `next`",
+    )
     args = parser.parse_args()
 
+    # The first session is optional only in persistent mode
+    given = [v is not None for v in (args.course, args.batch, args.total)]
+    if not all(given) and (any(given) or not args.persistent):
+        parser.error("--course, --batch and --total are required (optional together with --persistent)")
+
     db_path = args.db if args.db else settings.default_db
     print(f"[DEBUG] Using DB: {db_path}")
 
@@ -37,95 +126,110 @@ def main():
     try:
         db_service.connect(db_path)
         print("[DEBUG] DB connection established")
+        if args.workers > 1:
+            # Session state must live in SQLite to be shared by workers
+            session_service.enable_shared_state()
+            print(f"[DEBUG] Shared session state enabled for {args.workers} workers")
     except Exception:
         print("[ERROR] Failed to connect to DB")
         traceback.print_exc()
         sys.exit(1)
 
     # -------------------------
-    # Initialize session
+    # Initialize session and its attendance table
     # -------------------------
-    try:
-        # new (correct)
-        session_service.start_session(
-            max_count=args.total,
-            course=args.course,
-            batch=args.batch,
-            db_filename=db_path.split("/")[-1],  # just the filename
-        )
-        table_name = session_service.get_table_name
-        session_code = session_service.get_session_code
+    if args.course is not None:
+        try:
+            session = session_service.open_session(
+                max_count=args.total,
+                course=args.course,
+                batch=args.batch,
+                db_filename=db_path.split("/")[-1],  # just the filename
+            )
+            print("+------------------------------------------------------------------------------------+")
+            print(f" [DEBUG] Session initialized: {session.table_name}")
+            print(f" [DEBUG] Session code (share with students): {session.code}")
+            print(f" [DEBUG] Admin key (keep private, X-Admin-Key header): {get_admin_key()}")
+            print("+------------------------------------------------------------------------------------+")
+        except Exception:
+            print("[ERROR] Failed to initialize session")
+            traceback.print_exc()
+            sys.exit(1)
+    else:
         print("+------------------------------------------------------------------------------------+")
-        print(f" [DEBUG] Session initialized: {table_name}")
-        print(f" [DEBUG] Session code (share with students): {session_code}")
+        print(" [DEBUG] Persistent mode: no session yet, type `next <course> <batch> <total>`")
+        print(f" [DEBUG] Admin key (keep private, X-Admin-Key header): {get_admin_key()}")
         print("+------------------------------------------------------------------------------------+")
-    except Exception:
-        print("[ERROR] Failed to initialize session")
-        traceback.print_exc()
-        sys.exit(1)
 
     # -------------------------
-    # Create attendance table
+    # Load and precompress client assets
     # -------------------------
     try:
-        db_service.create_table(table_name)
-        print(f"[DEBUG] Attendance table created: {table_name}")
+        asset_service.load()
+        print("[DEBUG] Entry page cached in memory")
     except Exception:
-        print("[ERROR] Failed to create attendance table")
+        print("[ERROR] Failed to load client assets")
         traceback.print_exc()
         sys.exit(1)
 
-    # -------------------------
-    # Launch FastAPI app
-    # -------------------------
-    app = FastAPI(title="Presenz Attendance System")
-    @app.get("/")
-    def root():
-        return RedirectResponse(url="/attendance/")
-    app.include_router(router, prefix="/attendance")
-
     # -------------------------
     # Initialize KillSwitch
     # -------------------------
-    killswitch = KillSwitchService()
-    app.add_middleware(ActivityMiddleware, killswitch=killswitch)
-    print("[DEBUG] FastAPI app initialized")
-    print("[DEBUG] Presenz is ready to accept attendance submissions")
+    ctx = multiprocessing.get_context("spawn")
+    # Workers stamp activity into shared memory the parent's monitor reads
+    activity = ctx.Value("d", lock=False) if args.workers > 1 else None
+    # Persistent servers outlive sessions: only explicit timers stop them
+    killswitch = KillSwitchService(
+        timeout_minutes=0 if args.persistent else settings.killswitch_idle_timeout_minutes,
+        activity=activity,
+        idle_checkpoint_seconds=settings.db_idle_checkpoint_seconds if settings.db_wal_mode else 0,
+        max_duration_minutes=settings.killswitch_max_duration_minutes,
+        close_at=settings.killswitch_close_at,
+        close_at_capacity=settings.killswitch_close_at_capacity and not args.persistent,
+        capacity_grace_seconds=settings.killswitch_capacity_grace_seconds,
+    )
+    killswitch.register_command(
+        "snapshot",
+        lambda args: snapshot_service.snapshot_async(args[0] if args else None),
+    )
+    register_session_commands(killswitch)
+    if args.workers == 1:
+        # Worker processes have no terminal; profile a single process instead
+        register_profile_command(killswitch)
 
-    # -------------------------
-    # Run server with kill switch
-    # -------------------------
-    async def run_server():
-        config = uvicorn.Config(app, host=settings.server_host, port=settings.server_port)
-        server = uvicorn.Server(config)
+    print("[DEBUG] Presenz is ready to accept attendance submissions")
 
-        # -------------------------
-        # Launch server and KillSwitch tasks concurrently
-        # -------------------------
-        server_task = asyncio.create_task(server.serve())
-        monitor_task = asyncio.create_task(killswitch.inactivity_monitor())
+    async def run_with_killswitch(serve, stop) -> None:
+        """Run `serve` alongside the KillSwitch tasks until shutdown fires."""
+        server_task = asyncio.create_task(serve())
+        monitor_task = asyncio.create_task(killswitch.deadline_monitor())
         listener_task = asyncio.create_task(killswitch.manual_terminate_listener())
+        snapshot_task = asyncio.create_task(snapshot_service.run_schedule())
+        shutdown_task = asyncio.create_task(killswitch.wait_for_shutdown())
 
         try:
-            # Wait until KillSwitch triggers shutdown
-            await killswitch.wait_for_shutdown()
+            # Wait until KillSwitch triggers shutdown (or the server stops)
+            await asyncio.wait(
+                [server_task, shutdown_task],
+                return_when=asyncio.FIRST_COMPLETED,
+            )
             print("[DEBUG] KillSwitch triggered shutdown.")
-            server.should_exit = True  # Graceful shutdown
+            stop()  # Graceful shutdown
 
-            # Wait for the uvicorn server to exit cleanly
+            # Wait for the server to exit cleanly
             await server_task
 
         except Exception as e:
             print("[ERROR] Exception in server run:", e)
 
         finally:
-            # Cleanup DB and session
-            db_service.close()
+            # Cleanup session and DB
             session_service.end_session()
+            db_service.close()
             print("[DEBUG] Server shutdown gracefully.")
 
             # Cancel background tasks if still running
-            for task in [listener_task, monitor_task]:
+            for task in [listener_task, monitor_task, snapshot_task, shutdown_task]:
                 if not task.done():
                     task.cancel()
                     try:
@@ -133,15 +237,69 @@ def main():
                     except asyncio.CancelledError:
                         pass
 
+    # -------------------------
+    # Run server with kill switch
+    # -------------------------
+    async def run_server():
+        import uvicorn # type: ignore
+
+        started = time.perf_counter()
+        app = create_app(killswitch=killswitch)
+        print(f"[DEBUG] FastAPI app initialized in {(time.perf_counter() - started) * 1000:.0f} ms")
+        config = uvicorn.Config(app, host=settings.server_host, port=settings.server_port)
+        server = uvicorn.Server(config)
+
+        def stop():
+            server.should_exit = True
+
+        await run_with_killswitch(server.serve, stop)
+
+    # -------------------------
+    # Run worker processes with kill switch
+    # -------------------------
+    async def run_workers():
+        sock = bind_socket(settings.server_host, settings.server_port)
+        workers = [
+            ctx.Process(
+                target=run_worker,
+                kwargs={"sockets": [sock], "db_path": db_path, "activity": activity},
+                name=f"presenz-worker-{i}",
+            )
+            for i in range(args.workers)
+        ]
+        for worker in workers:
+            worker.start()
+        print(f"[DEBUG] Started {len(workers)} workers on {settings.server_host}:{settings.server_port}")
+
+        async def supervise():
+            # Returns when every worker has exited
+            while any(w.is_alive() for w in workers):
+                await asyncio.sleep(1)
+
+        def stop():
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()  # SIGTERM: uvicorn drains and exits
+
+        try:
+            await run_with_killswitch(supervise, stop)
+        finally:
+            for worker in workers:
+                worker.join(timeout=10)
+            sock.close()
+
     # -------------------------
     # Launch server
     # -------------------------
     try:
-        asyncio.run(run_server())
+        asyncio.run(run_workers() if args.workers > 1 else run_server())
     except Exception:
         print("[ERROR] Failed to start FastAPI server")
         traceback.print_exc()
         sys.exit(1)
 
 if __name__ == "__main__":
+    # Spawned --workers children of a frozen (PyInstaller) build run their
+    # task here instead of re-entering main()
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,56 @@
+# server/app.py
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional, Union
+
+from server.config import settings
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI # type: ignore
+    from server.services.killswitch_service import KillSwitchService
+
+
+def create_app(
+    config: Union[str, Path, Dict[str, Any], None] = None,
+    killswitch: Optional["KillSwitchService"] = None,
+) -> "FastAPI":
+    """
+    Assemble the FastAPI app. Shared by the single-process server and
+    every worker process.
+
+    `config` (a dict or a JSON path) replaces config/config.json. FastAPI,
+    the routes and the middleware are imported here rather than at module
+    level, so processes that never serve (the multi-worker parent, CLI
+    tools) don't pay for them.
+    """
+    if config is not None:
+        settings.configure(config)
+
+    from fastapi import FastAPI # type: ignore
+    from fastapi.responses import RedirectResponse # type: ignore
+
+    from server.routes import router
+    from server.routes.metrics import router as metrics_router
+    from server.routes.testing import router as testing_router, test_hooks_enabled
+    from server.middleware import ActivityMiddleware, RateLimitMiddleware
+    from server.services.killswitch_service import KillSwitchService
+
+    if killswitch is None:
+        killswitch = KillSwitchService()
+
+    app = FastAPI(title="Presenz Attendance System")
+
+    @app.get("/")
+    def root():
+        return RedirectResponse(url="/attendance/")
+
+    app.include_router(router, prefix="/attendance")
+    app.include_router(metrics_router)
+    if test_hooks_enabled():
+        print("[DEBUG] Test hooks enabled at /attendance/test (do not expose publicly)")
+        app.include_router(testing_router, prefix="/attendance/test")
+    if settings.rate_limit_enabled:
+        # Added first so it sits inside ActivityMiddleware: rejects are still measured
+        app.add_middleware(RateLimitMiddleware)
+    app.add_middleware(ActivityMiddleware, killswitch=killswitch)
+    return app
@@ -3,21 +3,49 @@
 import json
 import os
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Union
+
+
+# Used when neither CONFIG_PATH nor ./config/config.json exists, so
+# tools started from another directory still find the bundled config
+PACKAGE_CONFIG = Path(__file__).resolve().parent.parent.parent / "config" / "config.json"
 
 
 class Settings:
+    """
+    Configuration read from config/config.json on first access, not at
+    import time, so importing server modules stays cheap.
+    """
+
     def __init__(self) -> None:
-        self._config = self._load_config()
+        self._loaded: Optional[Dict[str, Any]] = None
+
+    @property
+    def _config(self) -> Dict[str, Any]:
+        if self._loaded is None:
+            self._loaded = self._load_config()
+        return self._loaded
+
+    def configure(self, config: Union[str, Path, Dict[str, Any]]) -> None:
+        """Use a config dict, or the JSON file at a path, instead of CONFIG_PATH."""
+        if isinstance(config, dict):
+            self._loaded = config
+        else:
+            self._loaded = self._read(Path(config))
 
     def _load_config(self) -> Dict[str, Any]:
         """
         Load configuration from config/config.json.
         Allows override via CONFIG_PATH environment variable.
         """
-        config_path = os.getenv("CONFIG_PATH", "config/config.json")
-        path = Path(config_path)
+        config_path = os.getenv("CONFIG_PATH")
+        if config_path:
+            return self._read(Path(config_path))
+
+        path = Path("config/config.json")
+        return self._read(path if path.exists() else PACKAGE_CONFIG)
 
+    def _read(self, path: Path) -> Dict[str, Any]:
         if not path.exists():
             raise FileNotFoundError(f"Config file not found at {path}")
 
@@ -53,6 +81,35 @@ class Settings:
     def db_timeout(self) -> int:
         return self._config["database"]["timeout_seconds"]
 
+    @property
+    def db_schema(self) -> str:
+        return self._config["database"]["schema"]
+
+    @property
+    def db_read_pool_size(self) -> int:
+        return self._config["database"]["read_pool_size"]
+
+    @property
+    def db_batch_max_rows(self) -> int:
+        return self._config["database"]["batch_max_rows"]
+
+    @property
+    def db_batch_max_wait_ms(self) -> int:
+        return self._config["database"]["batch_max_wait_ms"]
+
+    @property
+    def db_pragmas(self) -> Dict[str, Any]:
+        """PRAGMA values of the profile named by database.pragmas."""
+        name = self._config["database"]["pragmas"]
+        profiles = self._config["database"]["pragma_profiles"]
+        if name not in profiles:
+            raise ValueError(f"Unknown database.pragmas profile: {name}")
+        return profiles[name]
+
+    @property
+    def db_idle_checkpoint_seconds(self) -> int:
+        return self._config["database"]["idle_checkpoint_seconds"]
+
     # ------------------------
     # Session
     # ------------------------
@@ -75,6 +132,10 @@ class Settings:
     def max_roll_length(self) -> int:
         return self._config["security"]["max_roll_length"]
 
+    @property
+    def admin_key(self) -> str:
+        return self._config["security"]["admin_key"]
+
     # ------------------------
     # Export
     # ------------------------
@@ -86,6 +147,160 @@ class Settings:
     def export_format(self) -> str:
         return self._config["export"]["format"]
 
+    @property
+    def export_chunk_rows(self) -> int:
+        return self._config["export"]["chunk_rows"]
+
+    # ------------------------
+    # KillSwitch
+    # ------------------------
+    @property
+    def killswitch_idle_timeout_minutes(self) -> float:
+        return self._config["killswitch"]["idle_timeout_minutes"]
+
+    @property
+    def killswitch_max_duration_minutes(self) -> float:
+        return self._config["killswitch"]["max_duration_minutes"]
+
+    @property
+    def killswitch_close_at(self) -> str:
+        return self._config["killswitch"]["close_at"]
+
+    @property
+    def killswitch_close_at_capacity(self) -> bool:
+        return self._config["killswitch"]["close_at_capacity"]
+
+    @property
+    def killswitch_capacity_grace_seconds(self) -> int:
+        return self._config["killswitch"]["capacity_grace_seconds"]
+
+    # ------------------------
+    # Rate limiting
+    # ------------------------
+    @property
+    def rate_limit_enabled(self) -> bool:
+        return self._config["rate_limit"]["enabled"]
+
+    @property
+    def rate_limit_trust_cf_connecting_ip(self) -> bool:
+        return self._config["rate_limit"]["trust_cf_connecting_ip"]
+
+    @property
+    def rate_limit_trusted_proxies(self) -> List[str]:
+        return self._config["rate_limit"]["trusted_proxies"]
+
+    @property
+    def rate_limit_ip_rate(self) -> float:
+        return self._config["rate_limit"]["ip_rate_per_second"]
+
+    @property
+    def rate_limit_ip_burst(self) -> int:
+        return self._config["rate_limit"]["ip_burst"]
+
+    @property
+    def rate_limit_session_rate(self) -> float:
+        return self._config["rate_limit"]["session_rate_per_second"]
+
+    @property
+    def rate_limit_session_burst(self) -> int:
+        return self._config["rate_limit"]["session_burst"]
+
+    @property
+    def rate_limit_max_submissions_per_ip(self) -> int:
+        return self._config["rate_limit"]["max_submissions_per_ip"]
+
+    @property
+    def rate_limit_max_tracked_clients(self) -> int:
+        return self._config["rate_limit"]["max_tracked_clients"]
+
+    @property
+    def rate_limit_max_body_bytes(self) -> int:
+        return self._config["rate_limit"]["max_body_bytes"]
+
+    # ------------------------
+    # Idempotency
+    # ------------------------
+    @property
+    def idempotency_ttl_seconds(self) -> float:
+        return self._config["idempotency"]["ttl_seconds"]
+
+    @property
+    def idempotency_max_entries(self) -> int:
+        return self._config["idempotency"]["max_entries"]
+
+    @property
+    def idempotency_max_key_length(self) -> int:
+        return self._config["idempotency"]["max_key_length"]
+
+    # ------------------------
+    # Admission control
+    # ------------------------
+    @property
+    def admission_enabled(self) -> bool:
+        return self._config["admission"]["enabled"]
+
+    @property
+    def admission_max_in_flight(self) -> int:
+        return self._config["admission"]["max_in_flight"]
+
+    @property
+    def admission_target_delay_ms(self) -> float:
+        return self._config["admission"]["target_delay_ms"]
+
+    @property
+    def admission_interval_ms(self) -> float:
+        return self._config["admission"]["interval_ms"]
+
+    @property
+    def admission_retry_after_seconds(self) -> int:
+        return self._config["admission"]["retry_after_seconds"]
+
+    # ------------------------
+    # Snapshot
+    # ------------------------
+    @property
+    def snapshot_path(self) -> str:
+        return self._config["snapshot"]["path"]
+
+    @property
+    def snapshot_method(self) -> str:
+        return self._config["snapshot"]["method"]
+
+    @property
+    def snapshot_pages_per_step(self) -> int:
+        return self._config["snapshot"]["pages_per_step"]
+
+    @property
+    def snapshot_step_sleep_ms(self) -> int:
+        return self._config["snapshot"]["step_sleep_ms"]
+
+    @property
+    def snapshot_max_restarts(self) -> int:
+        return self._config["snapshot"]["max_restarts"]
+
+    @property
+    def snapshot_interval_minutes(self) -> int:
+        return self._config["snapshot"]["interval_minutes"]
+
+    # ------------------------
+    # Profiler
+    # ------------------------
+    @property
+    def profile_path(self) -> str:
+        return self._config["profile"]["path"]
+
+    @property
+    def profile_interval_ms(self) -> int:
+        return self._config["profile"]["interval_ms"]
+
+    @property
+    def profile_max_samples(self) -> int:
+        return self._config["profile"]["max_samples"]
+
+    @property
+    def profile_max_traces(self) -> int:
+        return self._config["profile"]["max_traces"]
+
 
 # Singleton instance
 settings = Settings()
\ No newline at end of file
@@ -1,5 +1,6 @@
 # server/middleware/__init__.py
 
 from .activity_middleware import ActivityMiddleware
+from .rate_limit_middleware import RateLimitMiddleware
 
-__all__ = ["ActivityMiddleware"]
\ No newline at end of file
+__all__ = ["ActivityMiddleware", "RateLimitMiddleware"]
\ No newline at end of file
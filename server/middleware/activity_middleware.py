@@ -1,10 +1,14 @@
 # server/middleware/activity_middleware.py
 
+import time
+
 from server.services.killswitch_service import KillSwitchService
+from server.services.metrics_service import metrics_service
 
 class ActivityMiddleware:
     """
     ASGI Middleware to track request activity and update the KillSwitch timestamp.
+    Also records each response's status class and time to first byte.
     """
 
     def __init__(self, app, killswitch: KillSwitchService):
@@ -13,6 +17,16 @@ class ActivityMiddleware:
 
     async def __call__(self, scope, receive, send):
         # Only track HTTP requests
-        if scope["type"] == "http":
-            self.killswitch.update_activity()
-        await self.app(scope, receive, send)
\ No newline at end of file
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self.killswitch.update_activity()
+        started = time.perf_counter()
+
+        async def send_with_metrics(message):
+            if message["type"] == "http.response.start":
+                metrics_service.observe_request(message["status"], time.perf_counter() - started)
+            await send(message)
+
+        await self.app(scope, receive, send_with_metrics)
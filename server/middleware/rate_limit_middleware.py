@@ -0,0 +1,272 @@
+# server/middleware/rate_limit_middleware.py
+
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from server.config import settings
+from server.security.validators import sanitize_text, ValidationError
+from server.services.metrics_service import metrics_service
+from server.services.session_service import session_service
+
+
+def _replayed(message) -> bool:
+    return any(name == b"idempotent-replayed" for name, _ in message.get("headers", ()))
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `capacity`."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Spend one token. Returns 0 when allowed, else seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class BucketTable:
+    """
+    LRU-bounded map of key -> TokenBucket. Evicting an idle client only
+    forgets its history, so the bound caps memory under IP floods.
+    Touched from the event loop thread only.
+    """
+
+    def __init__(self, rate: float, capacity: int, max_entries: int) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._max_entries = max(1, max_entries)
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def take(self, key: str) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self._rate, self._capacity)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self._max_entries:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.take()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SubmissionCounter:
+    """
+    LRU-bounded count of submissions accepted per key (client IP and
+    session). Slots are taken before the request reaches the route and
+    given back when the answer is not a fresh acceptance.
+    Touched from the event loop thread only.
+    """
+
+    def __init__(self, limit: int, max_entries: int) -> None:
+        self._limit = limit
+        self._max_entries = max(1, max_entries)
+        self._counts: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+
+    def take(self, key: Tuple[str, str]) -> bool:
+        count = self._counts.get(key, 0)
+        if count >= self._limit:
+            return False
+        self._counts[key] = count + 1
+        self._counts.move_to_end(key)
+        if len(self._counts) > self._max_entries:
+            self._counts.popitem(last=False)
+        return True
+
+    def give_back(self, key: Tuple[str, str]) -> None:
+        count = self._counts.get(key)
+        if count is None:
+            return
+        if count <= 1:
+            del self._counts[key]
+        else:
+            self._counts[key] = count - 1
+
+
+class RateLimitMiddleware:
+    """
+    Pure-ASGI filter in front of the submit route.
+
+    Before any routing, body model or threadpool work it:
+      1. charges the client's IP bucket (CF-Connecting-IP behind the tunnel),
+      2. buffers the small JSON body and answers 400 for unknown session codes,
+      3. charges the session's bucket,
+      4. caps how many submissions one IP gets accepted per session.
+    Over-rate requests get 429 with Retry-After, an IP over its
+    submission cap gets 403. Everything else is replayed to the app
+    unchanged.
+
+    CF-Connecting-IP is only believed when trusting it is enabled and
+    the request comes from one of `trusted_proxies` (the local
+    cloudflared); otherwise any client could pick its own bucket.
+    Requests from a trusted proxy without that header skip the per-IP
+    limits, since they all share the proxy's address.
+    """
+
+    def __init__(self, app, submit_path: str = "/attendance/submit"):
+        self.app = app
+        self.submit_path = submit_path
+        self.trust_cf_header = settings.rate_limit_trust_cf_connecting_ip
+        self.trusted_proxies = frozenset(settings.rate_limit_trusted_proxies)
+        self.max_body = settings.rate_limit_max_body_bytes
+        max_entries = settings.rate_limit_max_tracked_clients
+        self.ip_buckets = BucketTable(settings.rate_limit_ip_rate, settings.rate_limit_ip_burst, max_entries)
+        self.session_buckets = BucketTable(
+            settings.rate_limit_session_rate, settings.rate_limit_session_burst, max_entries,
+        )
+        self.submissions = SubmissionCounter(settings.rate_limit_max_submissions_per_ip, max_entries)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] != self.submit_path:
+            await self.app(scope, receive, send)
+            return
+
+        # -------------------------
+        # Per-client bucket
+        # -------------------------
+        ip = self._client_ip(scope)
+        if ip is not None:
+            wait = self.ip_buckets.take(ip)
+            if wait:
+                await self._reject(send, 429, "Too many requests", wait)
+                return
+
+        # -------------------------
+        # Buffer the body and screen the session code
+        # -------------------------
+        body, more = await self._read_body(receive)
+        if more:
+            await self._reject(send, 413, "Request body too large")
+            return
+
+        code = self._session_code(body)
+        if code is not None:
+            if session_service.get(code) is None:
+                metrics_service.count_outcome("invalid_code")
+                await self._reject(send, 400, "Invalid session code")
+                return
+
+            # -------------------------
+            # Per-session bucket
+            # -------------------------
+            wait = self.session_buckets.take(code)
+            if wait:
+                await self._reject(send, 429, "Too many requests", wait)
+                return
+
+            # -------------------------
+            # Accepted submissions per IP and session
+            # -------------------------
+            if ip is not None:
+                key = (ip, code)
+                if not self.submissions.take(key):
+                    metrics_service.count_outcome("throttled")
+                    await self._reject(send, 403, "Too many submissions from this network")
+                    return
+                answered = False
+
+                async def settle_send(message):
+                    # Keep the slot only for a fresh 200; replays and errors give it back
+                    nonlocal answered
+                    if message["type"] == "http.response.start" and not answered:
+                        answered = True
+                        if message["status"] != 200 or _replayed(message):
+                            self.submissions.give_back(key)
+                    await send(message)
+
+                try:
+                    await self.app(scope, self._replay(body, receive), settle_send)
+                finally:
+                    if not answered:
+                        self.submissions.give_back(key)
+                return
+
+        await self.app(scope, self._replay(body, receive), send)
+
+    # ----------------------------
+    # Helpers
+    # ----------------------------
+    def _client_ip(self, scope) -> Optional[str]:
+        """
+        The student's address, or None when it can't be known: requests
+        relayed by a trusted proxy while its header isn't trusted all
+        share the proxy's address, so per-IP limits are skipped.
+        """
+        client = scope.get("client")
+        peer = client[0] if client else ""
+        if peer not in self.trusted_proxies:
+            return peer
+        if self.trust_cf_header:
+            for name, value in scope["headers"]:
+                if name == b"cf-connecting-ip":
+                    return value.decode("latin-1").strip()
+        return None
+
+    async def _read_body(self, receive) -> Tuple[bytes, bool]:
+        """Whole body, or (partial, True) once it exceeds max_body."""
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body:
+                return b"", True
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks), False
+
+    def _session_code(self, body: bytes) -> Optional[str]:
+        """
+        The session code as AttendanceRequest will see it, or None when
+        the body is not screenable; the route then reports the error.
+        """
+        try:
+            payload = json.loads(body)
+            code = sanitize_text(payload["session_code"])
+        except (ValueError, TypeError, KeyError, ValidationError):
+            return None
+        if not 1 <= len(code) <= 32:
+            return None
+        return code
+
+    def _replay(self, body: bytes, receive):
+        sent = False
+
+        async def replay_receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Further calls wait for the disconnect, as with the real channel
+            return await receive()
+
+        return replay_receive
+
+    async def _reject(self, send, status: int, detail: str, retry_after: float = 0.0) -> None:
+        if status == 429:
+            metrics_service.count_outcome("throttled")
+        headers = [(b"content-type", b"application/json")]
+        if retry_after:
+            headers.append((b"retry-after", str(max(1, math.ceil(retry_after))).encode()))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": json.dumps({"detail": detail}).encode()})
@@ -0,0 +1,117 @@
+# server/migrate.py
+#
+# Fold per-session attendance tables into the consolidated schema.
+#
+# Usage (with the server stopped):
+#   python -m server.migrate --db db/ug-cs.db [--drop]
+
+import argparse
+import re
+import sqlite3
+import sys
+from datetime import datetime
+from typing import List, Tuple
+
+from server.services.db_service import CONSOLIDATED_SCHEMA, STATE_TABLE
+
+# "<dd-mm-yy-HHMM>-<COURSE>-<BATCH>" as created by SessionService
+TABLE_NAME_PATTERN = re.compile(r"^(\d{2}-\d{2}-\d{2}-\d{4})-([A-Z0-9]*)-([A-Z0-9]*)$")
+
+ATTENDANCE_COLUMNS = {"id", "name", "roll", "timestamp"}
+RESERVED_TABLES = {"sessions", "attendance", STATE_TABLE}
+
+
+def find_session_tables(conn: sqlite3.Connection) -> List[str]:
+    """Per-session attendance tables, oldest rowid first."""
+    tables = []
+    for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY rowid;"
+    ):
+        if name in RESERVED_TABLES:
+            continue
+        columns = {row[1] for row in conn.execute(f'PRAGMA table_info("{name}");')}
+        if ATTENDANCE_COLUMNS <= columns:
+            tables.append(name)
+    return tables
+
+
+def _parse_table_name(table_name: str) -> Tuple[str, str, str]:
+    """(course, batch, created_at) recovered from a session table name."""
+    match = TABLE_NAME_PATTERN.match(table_name)
+    if not match:
+        return "", "", datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    stamp, course, batch = match.groups()
+    created_at = datetime.strptime(stamp, "%d-%m-%y-%H%M").strftime("%Y-%m-%d %H:%M:%S")
+    return course, batch, created_at
+
+
+def migrate(db_path: str, drop: bool = False) -> List[Tuple[str, int]]:
+    """
+    Copy every per-session table into `sessions`/`attendance` in one
+    transaction. Safe to re-run: existing (session, roll) rows are kept.
+    Returns (table_name, rows_copied) per table.
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE;")
+        for statement in CONSOLIDATED_SCHEMA:
+            conn.execute(statement)
+
+        report = []
+        for table_name in find_session_tables(conn):
+            course, batch, created_at = _parse_table_name(table_name)
+            row_count = conn.execute(f'SELECT COUNT(*) FROM "{table_name}";').fetchone()[0]
+
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO sessions (table_name, course, batch, max_count, created_at)
+                VALUES (?, ?, ?, ?, ?);
+                """,
+                (table_name, course, batch, row_count, created_at),
+            )
+            session_id = conn.execute(
+                "SELECT id FROM sessions WHERE table_name = ?;", (table_name,),
+            ).fetchone()[0]
+
+            cursor = conn.execute(
+                f"""
+                INSERT OR IGNORE INTO attendance (session_id, name, roll, timestamp)
+                SELECT ?, name, roll, timestamp FROM "{table_name}" ORDER BY id;
+                """,
+                (session_id,),
+            )
+            report.append((table_name, cursor.rowcount))
+
+            if drop:
+                conn.execute(f'DROP TABLE "{table_name}";')
+
+        conn.execute("COMMIT;")
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK;")
+        raise
+    finally:
+        conn.close()
+
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Migrate Presenz DB to the consolidated schema")
+    parser.add_argument("--db", required=True, help="SQLite DB file path")
+    parser.add_argument("--drop", action="store_true", help="Drop per-session tables after copying")
+    args = parser.parse_args()
+
+    try:
+        report = migrate(args.db, drop=args.drop)
+    except Exception as e:
+        print("[ERROR] Migration failed:", e)
+        sys.exit(1)
+
+    for table_name, copied in report:
+        print(f"[DEBUG] {table_name}: {copied} rows copied")
+    print(f"[DEBUG] Migrated {len(report)} tables. Set database.schema to \"consolidated\" to use them.")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,6 @@ Contains:
 - Data validation models
 """
 
-from .schemas import AttendanceRequest
+from .schemas import AttendanceRequest, SessionCreateRequest
 
-__all__ = ["AttendanceRequest"]
\ No newline at end of file
+__all__ = ["AttendanceRequest", "SessionCreateRequest"]
\ No newline at end of file
@@ -1,24 +1,32 @@
 # server/models/schemas.py
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+from server.security.validators import (
+    sanitize_text,
+    validate_name,
+    validate_roll,
+)
 
 
 class AttendanceRequest(BaseModel):
     """
     Request body for attendance submission.
+
+    This is the single validation layer: field validators sanitize,
+    check length limits from config and charsets, and upper-case the
+    roll, so handlers can use the fields as-is.
     """
 
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     name: str = Field(
         ...,
-        min_length=2,
-        max_length=100,
         description="Student full name",
     )
 
     roll: str = Field(
         ...,
-        min_length=1,
-        max_length=30,
         description="Student roll number",
     )
 
@@ -29,5 +37,45 @@ class AttendanceRequest(BaseModel):
         description="Session verification code provided by teacher",
     )
 
-    class Config:
-        str_strip_whitespace = True
\ No newline at end of file
+    @field_validator("name")
+    @classmethod
+    def _check_name(cls, value: str) -> str:
+        return validate_name(value)
+
+    @field_validator("roll")
+    @classmethod
+    def _check_roll(cls, value: str) -> str:
+        return validate_roll(value)
+
+    @field_validator("session_code")
+    @classmethod
+    def _check_session_code(cls, value: str) -> str:
+        return sanitize_text(value)
+
+
+class SessionCreateRequest(BaseModel):
+    """
+    Request body for opening a session at runtime (operator only).
+    """
+
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    course: str = Field(
+        ...,
+        min_length=1,
+        max_length=50,
+        description="Course name",
+    )
+
+    batch: str = Field(
+        ...,
+        min_length=1,
+        max_length=50,
+        description="Batch ID",
+    )
+
+    total: int = Field(
+        ...,
+        gt=0,
+        description="Total number of students",
+    )
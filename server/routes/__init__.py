@@ -6,6 +6,15 @@ Routes package.
 Contains all HTTP endpoint modules.
 """
 
-from .attendance import router
+from fastapi import APIRouter # type: ignore
 
-__all__ = ["router"]
\ No newline at end of file
+from .attendance import router as attendance_router
+from .sessions import router as sessions_router
+from .status import router as status_router
+
+router = APIRouter()
+router.include_router(attendance_router)
+router.include_router(status_router)
+router.include_router(sessions_router, prefix="/sessions")
+
+__all__ = ["router"]
@@ -1,85 +1,285 @@
 # server/routes/attendance.py
 
+import asyncio
 import sqlite3
-from fastapi import APIRouter, HTTPException # type: ignore
-from fastapi.responses import FileResponse # type: ignore
-from pathlib import Path
+import time
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request # type: ignore
+from fastapi.responses import JSONResponse, Response, StreamingResponse # type: ignore
+from pydantic import ValidationError as PydanticValidationError
 
+from server.config import settings
 from server.models.schemas import AttendanceRequest
 from server.security import (
-    validate_name,
-    validate_roll,
-    validate_session_code,
+    require_admin,
     ValidationError,
 )
-from server.services.session_service import session_service
-from server.services.db_service import db_service
+from server.services.session_service import session_service, Session
+from server.services.feed_service import feed_service
+from server.services.db_service import SessionClosedError
+from server.services.db_writer import lock_error
+from server.services.asset_service import asset_service
+from server.services.export_service import export_service, MEDIA_TYPES
+from server.services.admission_service import admission_service
+from server.services.idempotency_service import idempotency_service, IdempotencyConflictError
+from server.services.metrics_service import metrics_service
+from server.services.profiler_service import profiler_service
+from server.routes.common import resolve_session
 
 router = APIRouter()
 
+CLOSED_RESPONSE = {
+    "status": "closed",
+    "message": "Attendance session closed",
+}
+
+# Seconds a client is asked to wait when the DB stayed locked past the
+# writer's retries; entry.html adds jitter on top
+BUSY_RETRY_AFTER = 1
+
+
 # -------------------------
 # Serve entry.html
 # -------------------------
-BASE_DIR = Path(__file__).resolve().parent.parent.parent  # presenz root
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
 
 @router.get("/")
-def serve_entry():
-    html_file = BASE_DIR / "client" / "entry.html"
-    if not html_file.exists():
+async def serve_entry(request: Request):
+    try:
+        page = asset_service.entry_page
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Entry form not found")
-    return FileResponse(html_file)
+
+    encoding, body, etag = page.select(request.headers.get("accept-encoding", ""))
+    headers = {
+        "ETag": etag,
+        "Cache-Control": page.cache_control,
+        "Vary": "Accept-Encoding",
+    }
+
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=page.media_type, headers=headers)
 
 
 # -------------------------
 # Submit attendance
 # -------------------------
-@router.post("/submit")
-def submit_attendance(payload: AttendanceRequest):
+def _parse_payload(body: bytes) -> AttendanceRequest:
+    """
+    Validate the raw JSON body in one pydantic-core pass.
+    Rule violations from our validators map to 400, malformed bodies to 422.
+    """
+    try:
+        return AttendanceRequest.model_validate_json(body)
+    except PydanticValidationError as e:
+        error = e.errors()[0]
+        cause = error.get("ctx", {}).get("error")
+        if isinstance(cause, ValidationError):
+            raise cause
+        field = ".".join(str(part) for part in error["loc"])
+        raise HTTPException(
+            status_code=422,
+            detail=f"{field}: {error['msg']}" if field else error["msg"],
+        )
+
+
+@router.post(
+    "/submit",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": AttendanceRequest.model_json_schema()}
+            },
+        }
+    },
+)
+async def submit_attendance(request: Request):
+    body = await request.body()
+
+    # Retries carry the same Idempotency-Key (entry.html sends one per submission)
+    key = request.headers.get("idempotency-key")
+    if key is None:
+        return await _submit(body)
+
+    valid_length = 1 <= len(key) <= settings.idempotency_max_key_length
+    if not (valid_length and key.isascii() and key.isprintable()):
+        metrics_service.count_outcome("invalid")
+        raise HTTPException(status_code=400, detail="Invalid Idempotency-Key")
+
+    # -------------------------
+    # Replay a completed submission (waits if it is still running)
+    # -------------------------
+    try:
+        stored = await idempotency_service.begin(key, body)
+    except IdempotencyConflictError as e:
+        metrics_service.count_outcome("invalid")
+        raise HTTPException(status_code=422, detail=str(e))
+
+    if stored is not None:
+        metrics_service.count_outcome("replayed")
+        return JSONResponse(
+            content=stored.content,
+            status_code=stored.status_code,
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+    try:
+        result = await _submit(body)
+    except HTTPException as e:
+        if e.status_code < 500:
+            idempotency_service.complete(key, e.status_code, {"detail": e.detail})
+        else:
+            idempotency_service.abandon(key)
+        raise
+    except BaseException:
+        idempotency_service.abandon(key)
+        raise
+
+    idempotency_service.complete(key, 200, result)
+    return result
+
+
+async def _record(session: Session, name: str, roll: str) -> None:
+    """Insert a claimed roll and settle the claim and capacity slot."""
+    try:
+        _, count = await session.insert(name, roll)
+    except SessionClosedError:
+        # Another worker filled or closed the shared session
+        session.release_roll(roll)
+        session.sync(session.max_count, session.active)
+        raise
+    except sqlite3.IntegrityError:
+        # UNIQUE constraint is the final safety net: the roll is recorded
+        session.release_reservation()
+        session.confirm_roll(roll)
+        raise
+    except BaseException:
+        session.release_reservation()
+        session.release_roll(roll)
+        raise
+
+    filled = session.commit_reservation(count)
+    session.confirm_roll(roll)
+    feed_service.notify(session.code)
+
+    # Only the commit that fills the session prints the banner
+    if filled:
+        print("+------------------------------------------------------------+")
+        print(f"| [DEBUG] {session.table_name}: all {session.max_count} responses submitted.")
+        print("+------------------------------------------------------------+")
+        session_service.session_filled(session)
+
+
+async def _submit(body: bytes) -> dict:
+    # Counted (and traced, when profiling) once in the finally block below
+    outcome = "error"
+    validation = capacity = db_insert = None
+    admitted = False
     try:
         # -------------------------
         # Validate Input
         # -------------------------
-        name = validate_name(payload.name)
-        roll = validate_roll(payload.roll)
+        stage_started = time.perf_counter()
+        payload = _parse_payload(body)
+        name = payload.name
+        roll = payload.roll
 
-        validate_session_code(
-            payload.session_code,
-            session_service.get_session_code,
-        )
+        # -------------------------
+        # Route to the session by its code
+        # -------------------------
+        session = session_service.get(payload.session_code)
+        if session is None:
+            outcome = "invalid_code"
+            raise ValidationError("Invalid session code")
 
-        table_name = session_service.get_table_name
+        now = time.perf_counter()
+        validation = now - stage_started
+        metrics_service.observe_stage("validation", validation)
+        stage_started = now
 
         # -------------------------
         # Check submission limit
         # -------------------------
-        if not session_service.can_accept_submission():
-            return {
-                "status": "closed",
-                "message": "Attendance session closed",
-            }
+        if session.is_closed():
+            outcome = "closed"
+            return CLOSED_RESPONSE
+
+        # -------------------------
+        # Reject known duplicates without touching the DB
+        # -------------------------
+        if not await session.claim_roll(roll):
+            outcome = "duplicate"
+            raise HTTPException(
+                status_code=409,
+                detail="Roll number already submitted",
+            )
+
+        # -------------------------
+        # Shed load the DB writer can't keep up with
+        # -------------------------
+        admitted = admission_service.try_acquire()
+        if not admitted:
+            session.release_roll(roll)
+            outcome = "shed"
+            raise HTTPException(
+                status_code=503,
+                detail="Server busy, retrying shortly",
+                headers={"Retry-After": str(settings.admission_retry_after_seconds)},
+            )
+
+        # -------------------------
+        # Reserve a capacity slot
+        # -------------------------
+        if not session.try_reserve():
+            session.release_roll(roll)
+            outcome = "closed"
+            return CLOSED_RESPONSE
+
+        now = time.perf_counter()
+        capacity = now - stage_started
+        metrics_service.observe_stage("capacity", capacity)
+        stage_started = now
 
         # -------------------------
         # Insert Attendance
         # -------------------------
-        db_service.insert_attendance(
-            table_name=table_name,
-            name=name,
-            roll=roll,
-        )
-        session_service.increment_count()
-        # If just reached max, print debug once
-        if session_service.is_full():
-            print("+------------------------------------------------------------+")
-            print(f"| [DEBUG] All {session_service._max_count} responses submitted.                         |")
-            print("+------------------------------------------------------------+")
+        # Shielded: if the client goes away the write still settles its
+        # claim and reservation, so same-roll requests waiting on it resume
+        try:
+            await asyncio.shield(asyncio.ensure_future(_record(session, name, roll)))
+        except SessionClosedError:
+            outcome = "closed"
+            return CLOSED_RESPONSE
+
+        db_insert = time.perf_counter() - stage_started
+        metrics_service.observe_stage("db_insert", db_insert)
 
+        outcome = "success"
         return {
             "status": "success",
             "message": "Attendance recorded successfully",
         }
 
+    except HTTPException as e:
+        if e.status_code not in (409, 503):
+            outcome = "invalid"
+        raise
+
     # Duplicate roll (UNIQUE constraint)
     except sqlite3.IntegrityError:
+        outcome = "duplicate"
         raise HTTPException(
             status_code=409,
             detail="Roll number already submitted",
@@ -87,15 +287,58 @@ def submit_attendance(payload: AttendanceRequest):
 
     # Validation errors
     except ValidationError as e:
+        if outcome != "invalid_code":
+            outcome = "invalid"
         raise HTTPException(
             status_code=400,
             detail=str(e),
         )
 
+    # Lock contention outlasted the writer's retries: nothing was written
+    except sqlite3.OperationalError as e:
+        if lock_error(e) is None:
+            print("[ERROR]", e)
+            raise HTTPException(status_code=500, detail="Internal server error")
+        raise HTTPException(
+            status_code=503,
+            detail="Server busy, retrying shortly",
+            headers={"Retry-After": str(BUSY_RETRY_AFTER)},
+        )
+
     # Any other unexpected error
     except Exception as e:
         print("[ERROR]", e)
         raise HTTPException(
             status_code=500,
             detail="Internal server error",
-        )
\ No newline at end of file
+        )
+
+    finally:
+        if admitted:
+            admission_service.release()
+        metrics_service.count_outcome(outcome)
+        if profiler_service.enabled:
+            profiler_service.trace(outcome, validation, capacity, db_insert)
+
+
+# -------------------------
+# Export attendance (operator only)
+# -------------------------
+@router.get("/export", dependencies=[Depends(require_admin)])
+def export_attendance(
+    fmt: Optional[str] = Query(None, alias="format"),
+    session_code: Optional[str] = Query(None, alias="session"),
+):
+    session = resolve_session(session_code)
+
+    try:
+        fmt = export_service.resolve_format(fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    table_name = session.table_name
+    return StreamingResponse(
+        export_service.stream_table(table_name, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{table_name}.{fmt}"'},
+    )
@@ -0,0 +1,26 @@
+# server/routes/common.py
+
+from typing import Optional
+
+from fastapi import HTTPException # type: ignore
+
+from server.services.session_service import Session, session_service
+
+
+def resolve_session(session_code: Optional[str]) -> Session:
+    """
+    Session for operator endpoints: by code, or the only active one
+    when no code is given.
+    """
+    if session_code:
+        session = session_service.get(session_code)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Unknown session code")
+        return session
+
+    active = session_service.sessions()
+    if len(active) == 1:
+        return active[0]
+    if not active:
+        raise HTTPException(status_code=404, detail="No active session")
+    raise HTTPException(status_code=400, detail="Several sessions active; pass ?session=<code>")
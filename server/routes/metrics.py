@@ -0,0 +1,82 @@
+# server/routes/metrics.py
+
+from anyio import to_thread
+from fastapi import APIRouter, Depends # type: ignore
+from fastapi.responses import PlainTextResponse # type: ignore
+
+from server.config import settings
+from server.security import require_admin
+from server.services.admission_service import admission_service
+from server.services.db_service import db_service
+from server.services.idempotency_service import idempotency_service
+from server.services.metrics_service import metrics_service
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _threadpool_stats():
+    # Only valid on the event loop thread, i.e. inside an async handler
+    return to_thread.current_default_thread_limiter().statistics()
+
+
+metrics_service.register_gauge(
+    "presenz_threadpool_busy",
+    "Threadpool workers running sync handlers or blocking calls.",
+    lambda: _threadpool_stats().borrowed_tokens,
+)
+metrics_service.register_gauge(
+    "presenz_threadpool_queued",
+    "Calls waiting for a free threadpool worker.",
+    lambda: _threadpool_stats().tasks_waiting,
+)
+metrics_service.register_gauge(
+    "presenz_threadpool_size",
+    "Threadpool capacity.",
+    lambda: _threadpool_stats().total_tokens,
+)
+metrics_service.register_gauge(
+    "presenz_db_writer_queue_depth",
+    "Jobs queued for the group-commit writer.",
+    lambda: db_service.writer_queue_depth,
+)
+metrics_service.register_gauge(
+    "presenz_db_writer_queue_delay_seconds",
+    "Shortest queueing delay in the writer's last batch (0 when its queue is empty).",
+    lambda: db_service.writer_queue_delay,
+)
+metrics_service.register_gauge(
+    "presenz_admission_in_flight",
+    "Submissions admitted and not yet answered.",
+    lambda: admission_service.in_flight,
+)
+metrics_service.register_gauge(
+    "presenz_admission_max_in_flight",
+    "Configured bound on admitted submissions.",
+    lambda: settings.admission_max_in_flight,
+)
+metrics_service.register_gauge(
+    "presenz_admission_target_delay_seconds",
+    "Writer queueing delay above which load is shed.",
+    lambda: settings.admission_target_delay_ms / 1000.0,
+)
+metrics_service.register_gauge(
+    "presenz_admission_overloaded",
+    "1 while the writer has a standing queue and new submissions are shed.",
+    lambda: int(admission_service.overloaded),
+)
+metrics_service.register_gauge(
+    "presenz_idempotency_entries",
+    "Completed submissions kept for Idempotency-Key replays.",
+    lambda: len(idempotency_service),
+)
+
+
+# -------------------------
+# Prometheus scrape endpoint
+# -------------------------
+@router.get("/metrics")
+async def metrics():
+    """Scrape with the admin key in X-Admin-Key, e.g. `http_headers` in Prometheus."""
+    return PlainTextResponse(metrics_service.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,88 @@
+# server/routes/sessions.py
+
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query # type: ignore
+
+from server.models.schemas import SessionCreateRequest
+from server.security import require_admin
+from server.services.session_service import session_service
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+# -------------------------
+# List active sessions
+# -------------------------
+@router.get("/")
+def list_sessions():
+    return {"sessions": [s.to_dict() for s in session_service.sessions()]}
+
+
+# -------------------------
+# Open a session at runtime
+# -------------------------
+@router.post("/")
+def open_session(payload: SessionCreateRequest):
+    try:
+        session = session_service.open_session(
+            max_count=payload.total,
+            course=payload.course,
+            batch=payload.batch,
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        print("[ERROR]", e)
+        raise HTTPException(status_code=500, detail="Failed to open session")
+
+    print(f"[DEBUG] Session opened: {session.table_name} (code {session.code})")
+    return session.to_dict()
+
+
+# -------------------------
+# Roll over to the next session (warm process)
+# -------------------------
+@router.post("/next")
+def next_session(
+    payload: SessionCreateRequest,
+    close_code: Optional[str] = Query(None, alias="close"),
+):
+    """Close the current session(s), or only ?close=<code>, and open the next."""
+    started = time.perf_counter()
+    try:
+        closed, session = session_service.rollover(
+            max_count=payload.total,
+            course=payload.course,
+            batch=payload.batch,
+            close_code=close_code,
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown session code")
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        print("[ERROR]", e)
+        raise HTTPException(status_code=500, detail="Failed to open session")
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"[DEBUG] Rolled over to {session.table_name} (code {session.code}) in {elapsed_ms:.1f}ms")
+    return {
+        "closed": [s.to_dict() for s in closed],
+        "opened": session.to_dict(),
+    }
+
+
+# -------------------------
+# Close a session
+# -------------------------
+@router.delete("/{session_code}")
+def close_session(session_code: str):
+    session = session_service.get(session_code)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown session code")
+
+    session_service.end_session(session_code)
+    print(f"[DEBUG] Session closed: {session.table_name}")
+    return session.to_dict()
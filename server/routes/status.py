@@ -0,0 +1,109 @@
+# server/routes/status.py
+
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request # type: ignore
+from fastapi.responses import StreamingResponse # type: ignore
+
+from server.routes.common import resolve_session
+from server.security import require_admin, require_admin_stream
+from server.services.db_service import db_service
+from server.services.feed_service import feed_service
+from server.services.session_service import Session, session_service
+
+router = APIRouter()
+
+ROSTER_PAGE_SIZE = 500
+HEARTBEAT_SECONDS = 15.0
+# Shared (multi-worker) sessions get no in-process notifications for
+# submissions handled by other workers, so their streams poll the cursor.
+SHARED_POLL_SECONDS = 1.0
+
+
+def _row_to_dict(row) -> dict:
+    return {"id": row[0], "name": row[1], "roll": row[2], "timestamp": row[3]}
+
+
+# -------------------------
+# Live count and capacity
+# -------------------------
+@router.get("/status", dependencies=[Depends(require_admin)])
+def attendance_status(session_code: Optional[str] = Query(None, alias="session")):
+    session = session_service.refresh_session(resolve_session(session_code))
+    return {
+        "session_code": session.code,
+        "count": session.current_count,
+        "max_count": session.max_count,
+        "closed": session.is_closed(),
+    }
+
+
+# -------------------------
+# Incremental roster (id cursor)
+# -------------------------
+@router.get("/roster", dependencies=[Depends(require_admin)])
+def attendance_roster(
+    session_code: Optional[str] = Query(None, alias="session"),
+    after: int = Query(0, ge=0),
+    limit: int = Query(ROSTER_PAGE_SIZE, ge=1, le=ROSTER_PAGE_SIZE),
+):
+    session = resolve_session(session_code)
+    rows = db_service.fetch_after(session.table_name, after, limit)
+    return {
+        "rows": [_row_to_dict(r) for r in rows],
+        "next": rows[-1][0] if rows else after,
+    }
+
+
+# -------------------------
+# Server-Sent Events stream
+# -------------------------
+async def _roster_events(request: Request, session: Session, cursor: int):
+    wake = feed_service.subscribe(session.code)
+    timeout = SHARED_POLL_SECONDS if session.shared else HEARTBEAT_SECONDS
+    try:
+        while True:
+            wake.clear()
+            rows = await asyncio.to_thread(
+                db_service.fetch_after, session.table_name, cursor, ROSTER_PAGE_SIZE,
+            )
+            for row in rows:
+                cursor = row[0]
+                yield f"event: attendance\nid: {cursor}\ndata: {json.dumps(_row_to_dict(row))}\n\n"
+            if len(rows) == ROSTER_PAGE_SIZE:
+                continue  # more backlog to drain
+
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+    finally:
+        feed_service.unsubscribe(session.code, wake)
+
+
+@router.get("/stream", dependencies=[Depends(require_admin_stream)])
+async def attendance_stream(
+    request: Request,
+    session_code: Optional[str] = Query(None, alias="session"),
+    after: Optional[int] = Query(None, ge=0),
+):
+    """
+    Pushes each accepted submission as an `attendance` event. Reconnecting
+    clients resume from Last-Event-ID; the key may be passed as ?key=.
+    """
+    session = resolve_session(session_code)
+
+    cursor = after
+    if cursor is None:
+        last_event_id = request.headers.get("last-event-id", "")
+        cursor = int(last_event_id) if last_event_id.isdigit() else 0
+
+    return StreamingResponse(
+        _roster_events(request, session, cursor),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,36 @@
+# server/routes/testing.py
+#
+# Test-only hooks, mounted at /attendance/test when PRESENZ_TEST_HOOKS=1.
+# Never enable on a server reachable by students: it reveals session codes.
+
+import os
+
+from fastapi import APIRouter # type: ignore
+
+from server.services.session_service import session_service
+
+TEST_HOOKS_ENV = "PRESENZ_TEST_HOOKS"
+
+router = APIRouter()
+
+
+def test_hooks_enabled() -> bool:
+    return os.getenv(TEST_HOOKS_ENV) == "1"
+
+
+# -------------------------
+# Session code discovery for load generators
+# -------------------------
+@router.get("/session")
+def current_sessions():
+    """Active sessions, newest last."""
+    return {
+        "sessions": [
+            {
+                "session_code": s.code,
+                "count": s.current_count,
+                "max_count": s.max_count,
+            }
+            for s in session_service.sessions()
+        ]
+    }
@@ -7,20 +7,24 @@ Contains:
 - Input validation
 - Sanitization logic
 - Security-related utilities
+- Admin key guard for operator endpoints
 """
 
+from .admin import get_admin_key, require_admin, require_admin_stream
+
 from .validators import (
     ValidationError,
     sanitize_text,
     validate_name,
     validate_roll,
-    validate_session_code,
 )
 
 __all__ = [
+    "get_admin_key",
+    "require_admin",
+    "require_admin_stream",
     "ValidationError",
     "sanitize_text",
     "validate_name",
     "validate_roll",
-    "validate_session_code",
 ]
\ No newline at end of file
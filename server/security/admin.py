@@ -0,0 +1,58 @@
+# server/security/admin.py
+
+import os
+import secrets
+import string
+from typing import Optional
+
+# fastapi.Request is this class; importing it from starlette keeps
+# `get_admin_key` usable without loading FastAPI
+from starlette.requests import Request # type: ignore
+
+from server.config import settings
+
+ADMIN_KEY_ENV = "PRESENZ_ADMIN_KEY"
+
+_admin_key: Optional[str] = None
+
+
+def get_admin_key() -> str:
+    """
+    Operator key for admin endpoints.
+    Taken from PRESENZ_ADMIN_KEY or security.admin_key; generated once
+    per process when both are empty. A generated key is exported to the
+    environment so child processes share it.
+    """
+    global _admin_key
+    if _admin_key is None:
+        key = os.getenv(ADMIN_KEY_ENV) or settings.admin_key
+        if not key:
+            alphabet = string.ascii_letters + string.digits
+            key = "".join(secrets.choice(alphabet) for _ in range(24))
+            os.environ[ADMIN_KEY_ENV] = key
+        _admin_key = key
+    return _admin_key
+
+
+def _check_key(key: Optional[str]) -> None:
+    from fastapi import HTTPException # type: ignore
+
+    if not key or not secrets.compare_digest(key, get_admin_key()):
+        raise HTTPException(status_code=401, detail="Admin key required")
+
+
+def require_admin(request: Request) -> None:
+    """
+    FastAPI dependency guarding operator endpoints.
+    The key must be sent in the X-Admin-Key header; a query parameter
+    would end up in access logs and browser history.
+    """
+    _check_key(request.headers.get("x-admin-key"))
+
+
+def require_admin_stream(request: Request) -> None:
+    """
+    `require_admin` for the SSE stream only: EventSource cannot set
+    headers, so the key may also come as a `key` query parameter.
+    """
+    _check_key(request.headers.get("x-admin-key") or request.query_params.get("key"))
@@ -2,14 +2,32 @@
 
 import re
 
+from server.config import settings
 
-class ValidationError(Exception):
+
+class ValidationError(ValueError):
     """
     Raised when user input validation fails.
+
+    Subclasses ValueError so pydantic field validators report it
+    as a regular validation error.
     """
     pass
 
 
+# Patterns are compiled once at import, not on every request
+_CONTROL_CHARS = re.compile(r"[\x00-\x1f\x7f]")
+_NAME_PATTERN = re.compile(r"[A-Za-z.\s]+")
+_ROLL_PATTERN = re.compile(r"[A-Za-z0-9\-]+")
+
+NAME_MIN_LENGTH = 2
+ROLL_MIN_LENGTH = 1
+
+# Raw input longer than this multiple of the configured limit is rejected
+# before sanitization, so oversized fields never reach the regex pass
+RAW_LENGTH_FACTOR = 2
+
+
 # -------------------------------------------------
 # BASIC SANITIZATION
 # -------------------------------------------------
@@ -23,7 +41,8 @@ def sanitize_text(value: str) -> str:
     value = value.strip()
 
     # Remove ASCII control characters
-    value = re.sub(r"[\x00-\x1f\x7f]", "", value)
+    if _CONTROL_CHARS.search(value):
+        value = _CONTROL_CHARS.sub("", value)
 
     return value
 
@@ -39,12 +58,18 @@ def validate_name(name: str) -> str:
         - Spaces
         - Dot (.)
     """
+    max_length = settings.max_name_length
+    if isinstance(name, str) and len(name) > max_length * RAW_LENGTH_FACTOR:
+        raise ValidationError(f"Name must be at most {max_length} characters")
+
     name = sanitize_text(name)
 
-    if not (2 <= len(name) <= 100):
-        raise ValidationError("Name length must be between 2 and 100 characters")
+    if not (NAME_MIN_LENGTH <= len(name) <= max_length):
+        raise ValidationError(
+            f"Name length must be between {NAME_MIN_LENGTH} and {max_length} characters"
+        )
 
-    if not re.fullmatch(r"[A-Za-z.\s]+", name):
+    if not _NAME_PATTERN.fullmatch(name):
         raise ValidationError("Name contains invalid characters")
 
     return name
@@ -61,26 +86,18 @@ def validate_roll(roll: str) -> str:
         - No spaces
         - No special characters
     """
+    max_length = settings.max_roll_length
+    if isinstance(roll, str) and len(roll) > max_length * RAW_LENGTH_FACTOR:
+        raise ValidationError(f"Roll number must be at most {max_length} characters")
+
     roll = sanitize_text(roll)
 
-    if not (1 <= len(roll) <= 30):
-        raise ValidationError("Roll number length must be between 1 and 30 characters")
+    if not (ROLL_MIN_LENGTH <= len(roll) <= max_length):
+        raise ValidationError(
+            f"Roll number length must be between {ROLL_MIN_LENGTH} and {max_length} characters"
+        )
 
-    if not re.fullmatch(r"[A-Za-z0-9\-]+", roll):
+    if not _ROLL_PATTERN.fullmatch(roll):
         raise ValidationError("Roll number must be alphanumeric only")
 
     return roll.upper()
-
-
-# -------------------------------------------------
-# SESSION CODE VALIDATION
-# -------------------------------------------------
-def validate_session_code(code: str, expected_code: str) -> None:
-    """
-    Validate session code entered by student.
-    The code is NOT stored in DB.
-    """
-    code = sanitize_text(code)
-
-    if code != expected_code:
-        raise ValidationError("Invalid session code")
\ No newline at end of file
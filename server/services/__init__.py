@@ -1,8 +1,23 @@
 # server/services/__init__.py
 
-from .session_service import session_service
-from .db_service import db_service
-from .export_service import export_service
-from .killswitch_service import KillSwitchService
+import importlib
 
-__all__ = ["session_service", "db_service", "export_service", "KillSwitchService"]
\ No newline at end of file
+# Resolved on first access, so importing one service module does not
+# import (and construct) all of them
+_EXPORTS = {
+    "session_service": ".session_service",
+    "db_service": ".db_service",
+    "export_service": ".export_service",
+    "asset_service": ".asset_service",
+    "KillSwitchService": ".killswitch_service",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,64 @@
+# server/services/admission_service.py
+
+import time
+from typing import Optional
+
+from server.config import settings
+from server.services.db_service import db_service
+
+
+class AdmissionService:
+    """
+    Decides whether a submission is taken on or shed with 503.
+
+    Two limits, both from the `admission` section of config.json:
+      - at most `max_in_flight` submissions past admission at once;
+      - CoDel on the DB writer's queueing delay: once the delay has
+        stayed above `target_delay_ms` for a whole `interval_ms`, the
+        writer has a standing queue and new submissions are shed until
+        the delay drops below target (or the queue empties).
+
+    Shedding early keeps latency flat for the submissions already
+    admitted instead of letting every request wait out the SQLite
+    timeout. Runs on the event loop; not thread-safe.
+    """
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.overloaded = False
+        self._above_since: Optional[float] = None
+
+    def try_acquire(self) -> bool:
+        """Admit one submission; pair every True with `release`."""
+        if not settings.admission_enabled:
+            self.in_flight += 1
+            return True
+
+        if self.in_flight >= settings.admission_max_in_flight:
+            return False
+
+        # -------------------------
+        # CoDel: only a delay that persists for an interval is a queue
+        # -------------------------
+        delay = db_service.writer_queue_delay
+        if delay < settings.admission_target_delay_ms / 1000.0:
+            self._above_since = None
+            self.overloaded = False
+        else:
+            now = time.monotonic()
+            if self._above_since is None:
+                self._above_since = now
+            elif now - self._above_since >= settings.admission_interval_ms / 1000.0:
+                self.overloaded = True
+
+        if self.overloaded:
+            return False
+
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+
+admission_service = AdmissionService()
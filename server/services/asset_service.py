@@ -0,0 +1,101 @@
+# server/services/asset_service.py
+
+import gzip
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # optional: gzip-only when brotli is not installed
+    brotli = None
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent  # presenz root
+CLIENT_DIR = BASE_DIR / "client"
+
+VENDOR_CSS_LINK = '<link href="vendor/bootstrap.trimmed.css" rel="stylesheet">'
+VENDOR_CSS_FILE = CLIENT_DIR / "vendor" / "bootstrap.trimmed.css"
+
+
+class StaticAsset:
+    """
+    An in-memory response body with precompressed variants.
+    """
+
+    def __init__(self, body: bytes, media_type: str, cache_control: str) -> None:
+        self.media_type = media_type
+        self.cache_control = cache_control
+
+        digest = hashlib.sha256(body).hexdigest()[:20]
+
+        # encoding -> (body, strong ETag)
+        self.variants: Dict[str, Tuple[bytes, str]] = {
+            "identity": (body, f'"{digest}"'),
+            "gzip": (gzip.compress(body, compresslevel=9, mtime=0), f'"{digest}-gz"'),
+        }
+        if brotli is not None:
+            self.variants["br"] = (brotli.compress(body, quality=11), f'"{digest}-br"')
+
+    def select(self, accept_encoding: str) -> Tuple[str, bytes, str]:
+        """Pick the smallest variant the client accepts."""
+        accepted = _parse_accept_encoding(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and accepted.get(encoding, 0.0) > 0:
+                body, etag = self.variants[encoding]
+                return encoding, body, etag
+        body, etag = self.variants["identity"]
+        return "identity", body, etag
+
+
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    accepted: Dict[str, float] = {}
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token.strip().lower()] = q
+    if "*" in accepted:
+        for encoding in ("br", "gzip"):
+            accepted.setdefault(encoding, accepted["*"])
+    return accepted
+
+
+class AssetService:
+    def __init__(self) -> None:
+        self._entry_page: Optional[StaticAsset] = None
+
+    # ----------------------------
+    # Load
+    # ----------------------------
+    def load(self) -> None:
+        """
+        Read entry.html once, inline the vendored CSS and precompress it.
+        """
+        html = (CLIENT_DIR / "entry.html").read_text(encoding="utf-8")
+        css = VENDOR_CSS_FILE.read_text(encoding="utf-8")
+        html = html.replace(VENDOR_CSS_LINK, f"<style>\n{css}</style>")
+
+        self._entry_page = StaticAsset(
+            html.encode("utf-8"),
+            media_type="text/html; charset=utf-8",
+            cache_control="public, max-age=300",
+        )
+
+    # ----------------------------
+    # Getters
+    # ----------------------------
+    @property
+    def entry_page(self) -> StaticAsset:
+        if self._entry_page is None:
+            self.load()
+        return self._entry_page
+
+
+asset_service = AssetService()
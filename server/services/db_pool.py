@@ -0,0 +1,83 @@
+# server/services/db_pool.py
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Sequence
+
+
+class ReadConnectionPool:
+    """
+    Bounded pool of read-only SQLite connections.
+
+    In WAL mode readers never block the writer thread, so roster,
+    export and status reads run here instead of on the write connection.
+    Connections are opened lazily up to `size`; when all are busy,
+    callers wait up to `timeout` seconds. `pragmas` run on every new
+    connection.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        size: int,
+        timeout: float,
+        pragmas: Sequence[str] = (),
+    ) -> None:
+        self._uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+        self._size = max(1, size)
+        self._timeout = timeout
+        self._pragmas = tuple(pragmas)
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self._uri,
+            uri=True,
+            timeout=self._timeout,
+            check_same_thread=False,
+        )
+        conn.execute("PRAGMA query_only=ON;")
+        for statement in self._pragmas:
+            conn.execute(statement)
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._opened) < self._size:
+                conn = self._open()
+                self._opened.append(conn)
+                return conn
+
+        try:
+            return self._idle.get(timeout=self._timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError("Read connection pool exhausted")
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection for the duration of the block."""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            # End any read transaction left open by a partially consumed cursor
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._opened:
+                conn.close()
+            self._opened = []
+        self._idle = queue.LifoQueue()
@@ -1,32 +1,197 @@
 # server/services/db_service.py
 
+import asyncio
 import sqlite3
-from typing import List, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from server.config import settings
+from server.services.db_pool import ReadConnectionPool
+from server.services.db_writer import GroupCommitWriter
+
+# Shared session state for multi-worker deployments
+STATE_TABLE = "presenz_session_state"
+
+# Consolidated schema: one attendance table keyed by (session_id, roll)
+# instead of one table per session. Also used by server/migrate.py.
+CONSOLIDATED_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        table_name TEXT NOT NULL UNIQUE,
+        course TEXT NOT NULL DEFAULT '',
+        batch TEXT NOT NULL DEFAULT '',
+        max_count INTEGER NOT NULL DEFAULT 0,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS attendance (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id INTEGER NOT NULL REFERENCES sessions(id),
+        name TEXT NOT NULL,
+        roll TEXT NOT NULL,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (session_id, roll)
+    );
+    """,
+    # Per-session scans and id-cursor reads in insertion order
+    "CREATE INDEX IF NOT EXISTS idx_attendance_session_id ON attendance (session_id, id);",
+    # Cross-session lookups for one student
+    "CREATE INDEX IF NOT EXISTS idx_attendance_roll ON attendance (roll);",
+    "CREATE INDEX IF NOT EXISTS idx_sessions_created_at ON sessions (created_at);",
+]
+
+
+# PRAGMAs a database.pragmas profile may set. Readers only take the
+# per-connection memory settings; durability and checkpointing belong
+# to the writer.
+PRAGMA_KEYS = ("synchronous", "cache_size", "mmap_size", "temp_store", "wal_autocheckpoint")
+READER_PRAGMA_KEYS = ("cache_size", "mmap_size", "temp_store")
+
+CHECKPOINT_MODES = ("PASSIVE", "FULL", "RESTART", "TRUNCATE")
+
+
+def pragma_statements(profile: Dict[str, Any], keys: Iterable[str] = PRAGMA_KEYS) -> List[str]:
+    """`PRAGMA key=value;` statements for the given keys of a profile."""
+    statements = []
+    for key in keys:
+        if key not in profile:
+            continue
+        value = profile[key]
+        # Values end up in SQL text: only integers and bare keywords
+        if not isinstance(value, int) and not (isinstance(value, str) and value.isalnum()):
+            raise ValueError(f"Invalid value for PRAGMA {key}: {value!r}")
+        statements.append(f"PRAGMA {key}={value};")
+    return statements
+
+
+class SessionClosedError(Exception):
+    """
+    Raised when the shared session state rejects a submission
+    (capacity reached or session closed by another process).
+    """
+    pass
+
+
+def create_consolidated_schema(conn: sqlite3.Connection) -> None:
+    for statement in CONSOLIDATED_SCHEMA:
+        conn.execute(statement)
 
 
 class DBService:
     def __init__(self) -> None:
-        self._connection = None
+        self._readers = None
+        self._writer = None
+        self._db_path = None
+        self._consolidated = False
+        self._session_ids: Dict[str, int] = {}
 
     # ----------------------------
     # Connect
     # ----------------------------
     def connect(self, db_path: str) -> None:
-        self._connection = sqlite3.connect(
+        self._db_path = db_path
+
+        # All writes go through a single group-commit writer thread
+        self._writer = GroupCommitWriter(
+            max_batch=settings.db_batch_max_rows,
+            max_wait_ms=settings.db_batch_max_wait_ms,
+        )
+        pragmas = settings.db_pragmas
+        unknown = set(pragmas) - set(PRAGMA_KEYS)
+        if unknown:
+            raise ValueError(f"Unsupported PRAGMAs in profile: {', '.join(sorted(unknown))}")
+
+        self._writer.start(
+            db_path,
+            timeout=settings.db_timeout,
+            wal_mode=settings.db_wal_mode,
+            pragmas=pragma_statements(pragmas),
+        )
+
+        # Reads never share the writer's connection
+        self._readers = ReadConnectionPool(
             db_path,
+            size=settings.db_read_pool_size,
             timeout=settings.db_timeout,
-            check_same_thread=False,
+            pragmas=pragma_statements(pragmas, READER_PRAGMA_KEYS),
         )
 
-        if settings.db_wal_mode:
-            self._connection.execute("PRAGMA journal_mode=WAL;")
+        self._consolidated = settings.db_schema == "consolidated"
+        self._session_ids = {}
+        if self._consolidated:
+            self._writer.submit(create_consolidated_schema).result()
+
+    # ----------------------------
+    # Statements (per-session vs consolidated schema)
+    # ----------------------------
+    def _session_id(self, table_name: str) -> int:
+        """Consolidated schema: resolve a session label to its sessions.id."""
+        session_id = self._session_ids.get(table_name)
+        if session_id is None:
+            rows = self._read("SELECT id FROM sessions WHERE table_name = ?;", (table_name,))
+            if not rows:
+                raise KeyError(f"Unknown session table: {table_name}")
+            session_id = self._session_ids[table_name] = rows[0][0]
+        return session_id
+
+    def _insert_statement(self, table_name: str, name: str, roll: str) -> Tuple[str, Tuple]:
+        if self._consolidated:
+            query = "INSERT INTO attendance (session_id, name, roll) VALUES (?, ?, ?);"
+            return query, (self._session_id(table_name), name, roll)
+        return f'INSERT INTO "{table_name}" (name, roll) VALUES (?, ?);', (name, roll)
+
+    def _select_statement(
+        self,
+        table_name: str,
+        columns: str,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[str, Tuple]:
+        clauses: List[str] = []
+        params: List = []
+        if self._consolidated:
+            source = "attendance"
+            clauses.append("session_id = ?")
+            params.append(self._session_id(table_name))
+        else:
+            source = f'"{table_name}"'
+        if after_id is not None:
+            clauses.append("id > ?")
+            params.append(after_id)
+
+        query = f"SELECT {columns} FROM {source}"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return query + ";", tuple(params)
 
     # ----------------------------
     # Table Creation
     # ----------------------------
-    def create_table(self, table_name: str) -> None:
+    def create_table(
+        self,
+        table_name: str,
+        course: str = "",
+        batch: str = "",
+        max_count: int = 0,
+    ) -> None:
+        """
+        Per-session schema: create the session's own table.
+        Consolidated schema: register the session in `sessions`.
+        """
+        if self._consolidated:
+            query = """
+            INSERT OR IGNORE INTO sessions (table_name, course, batch, max_count)
+            VALUES (?, ?, ?, ?);
+            """
+            self._writer.execute(query, (table_name, course, batch, max_count)).result()
+            self._session_id(table_name)
+            return
+
         query = f"""
         CREATE TABLE IF NOT EXISTS "{table_name}" (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -35,31 +200,199 @@ class DBService:
             timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
         );
         """
-        self._connection.execute(query)
-        self._connection.commit()
+        self._writer.execute(query).result()
 
     # ----------------------------
     # Insert
     # ----------------------------
     def insert_attendance(self, table_name: str, name: str, roll: str) -> None:
-        query = f'INSERT INTO "{table_name}" (name, roll) VALUES (?, ?);'
-        self._connection.execute(query, (name, roll))
-        self._connection.commit()
+        """
+        Queue the insert on the group-commit writer and wait for its batch.
+        Raises sqlite3.IntegrityError for a duplicate roll.
+        """
+        query, params = self._insert_statement(table_name, name, roll)
+        self._writer.execute(query, params).result()
+
+    async def insert_attendance_async(self, table_name: str, name: str, roll: str) -> int:
+        """
+        Awaitable variant for async handlers: the event loop is released
+        while the writer thread commits, no threadpool worker is held.
+        Returns the new row id.
+        """
+        query, params = self._insert_statement(table_name, name, roll)
+        return await asyncio.wrap_future(self._writer.execute(query, params))
+
+    async def insert_counted_attendance_async(
+        self,
+        session_code: str,
+        table_name: str,
+        name: str,
+        roll: str,
+    ) -> Tuple[int, int]:
+        """
+        Insert and bump the shared capacity counter in one savepoint, so
+        the --total limit holds across worker processes.
+        Returns (row id, new count); raises SessionClosedError when full or closed.
+        """
+        insert, params = self._insert_statement(table_name, name, roll)
+
+        def job(conn: sqlite3.Connection) -> Tuple[int, int]:
+            cursor = conn.execute(
+                f"""
+                UPDATE {STATE_TABLE}
+                SET current_count = current_count + 1
+                WHERE session_code = ? AND active = 1 AND current_count < max_count;
+                """,
+                (session_code,),
+            )
+            if cursor.rowcount == 0:
+                raise SessionClosedError(session_code)
+            row_id = conn.execute(insert, params).lastrowid
+            count = conn.execute(
+                f"SELECT current_count FROM {STATE_TABLE} WHERE session_code = ?;",
+                (session_code,),
+            ).fetchone()[0]
+            return row_id, count
+
+        return await asyncio.wrap_future(self._writer.submit(job))
+
+    # ----------------------------
+    # Shared session state
+    # ----------------------------
+    def create_state_table(self) -> None:
+        query = f"""
+        CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+            session_code TEXT PRIMARY KEY,
+            session_id TEXT NOT NULL,
+            table_name TEXT NOT NULL,
+            course TEXT NOT NULL,
+            batch TEXT NOT NULL,
+            max_count INTEGER NOT NULL,
+            current_count INTEGER NOT NULL DEFAULT 0,
+            active INTEGER NOT NULL DEFAULT 1
+        );
+        """
+        self._writer.execute(query).result()
+
+    def save_session_state(
+        self,
+        session_code: str,
+        session_id: str,
+        table_name: str,
+        course: str,
+        batch: str,
+        max_count: int,
+        current_count: int,
+    ) -> None:
+        query = f"""
+        INSERT OR IGNORE INTO {STATE_TABLE}
+            (session_code, session_id, table_name, course, batch, max_count, current_count)
+        VALUES (?, ?, ?, ?, ?, ?, ?);
+        """
+        params = (session_code, session_id, table_name, course, batch, max_count, current_count)
+        self._writer.execute(query, params).result()
+
+    def close_session_state(self, session_code: str) -> None:
+        query = f"UPDATE {STATE_TABLE} SET active = 0 WHERE session_code = ?;"
+        self._writer.execute(query, (session_code,)).result()
+
+    def fetch_session_states(self, session_code: Optional[str] = None) -> List[Tuple]:
+        """
+        (session_code, session_id, table_name, course, batch, max_count,
+        current_count, active) rows, optionally for a single code.
+        """
+        query = f"""
+        SELECT session_code, session_id, table_name, course, batch,
+               max_count, current_count, active
+        FROM {STATE_TABLE}
+        """
+        if session_code is None:
+            return self._read(query + " WHERE active = 1;")
+        return self._read(query + " WHERE session_code = ?;", (session_code,))
 
     # ----------------------------
-    # Fetch
+    # Fetch (read-only pool)
     # ----------------------------
+    def _read(self, query: str, params: Tuple = ()) -> List[Tuple]:
+        with self._readers.connection() as conn:
+            return conn.execute(query, params).fetchall()
+
     def fetch_all(self, table_name: str) -> List[Tuple]:
-        cursor = self._connection.cursor()
-        cursor.execute(f'SELECT name, roll, timestamp FROM "{table_name}";')
-        return cursor.fetchall()
+        query, params = self._select_statement(table_name, "name, roll, timestamp")
+        return self._read(query, params)
+
+    def iter_rows(self, table_name: str, chunk_size: int = 500) -> Iterator[Tuple]:
+        """
+        Stream (name, roll, timestamp) rows from a server-side cursor,
+        `chunk_size` rows at a time, without materializing the table.
+        """
+        query, params = self._select_statement(table_name, "name, roll, timestamp")
+        with self._readers.connection() as conn:
+            cursor = conn.execute(query, params)
+            try:
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield from rows
+            finally:
+                cursor.close()
+
+    def fetch_after(self, table_name: str, after_id: int, limit: int) -> List[Tuple]:
+        """(id, name, roll, timestamp) rows past an id cursor, oldest first."""
+        query, params = self._select_statement(
+            table_name, "id, name, roll, timestamp", after_id=after_id, limit=limit,
+        )
+        return self._read(query, params)
+
+    def fetch_rolls(self, table_name: str) -> List[str]:
+        query, params = self._select_statement(table_name, "roll")
+        return [row[0] for row in self._read(query, params)]
+
+    @property
+    def db_path(self) -> str:
+        return self._db_path
+
+    @property
+    def consolidated(self) -> bool:
+        return self._consolidated
+
+    @property
+    def writer_queue_depth(self) -> int:
+        return self._writer.queue_depth if self._writer else 0
+
+    @property
+    def writer_queue_delay(self) -> float:
+        return self._writer.queue_delay if self._writer else 0.0
+
+    # ----------------------------
+    # Checkpoint
+    # ----------------------------
+    async def checkpoint_async(self, mode: str = "TRUNCATE") -> Tuple[int, int, int]:
+        """
+        Run a WAL checkpoint on the writer thread, between batches.
+        Returns SQLite's (busy, wal pages, checkpointed pages); busy is 1
+        when readers kept it from completing.
+        """
+        mode = mode.upper()
+        if mode not in CHECKPOINT_MODES:
+            raise ValueError(f"Unsupported checkpoint mode: {mode}")
+
+        def job(conn: sqlite3.Connection) -> Tuple[int, int, int]:
+            return tuple(conn.execute(f"PRAGMA wal_checkpoint({mode});").fetchone())
+
+        return await asyncio.wrap_future(self._writer.submit(job, transactional=False))
 
     # ----------------------------
     # Close
     # ----------------------------
     def close(self) -> None:
-        if self._connection:
-            self._connection.close()
+        if self._writer:
+            self._writer.stop()
+            self._writer = None
+        if self._readers:
+            self._readers.close()
+            self._readers = None
 
 
 db_service = DBService()
\ No newline at end of file
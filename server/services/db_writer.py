@@ -0,0 +1,301 @@
+# server/services/db_writer.py
+
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from server.services.metrics_service import metrics_service
+
+Job = Callable[[sqlite3.Connection], Any]
+# (job, future, transactional, enqueued at; time.monotonic())
+Item = Tuple[Job, Future, bool, float]
+
+_STOP = object()
+
+# BEGIN/COMMIT attempts after SQLite's own busy timeout has expired,
+# e.g. while another worker process or a snapshot holds the lock
+LOCK_RETRIES = 3
+LOCK_RETRY_SLEEP = 0.05
+
+
+def lock_error(e: sqlite3.OperationalError) -> Optional[str]:
+    """"busy"/"locked" for lock contention, None for any other error."""
+    message = str(e)
+    if "database is locked" in message:
+        return "busy"
+    if "table is locked" in message:
+        return "locked"
+    return None
+
+
+class GroupCommitWriter:
+    """
+    Single writer thread that owns the SQLite write connection.
+
+    Jobs are queued from any thread and flushed together in one
+    transaction once `max_batch` jobs are pending or `max_wait_ms`
+    has elapsed. Every job runs inside its own SAVEPOINT, so a job
+    that fails (e.g. a duplicate roll) is rolled back and reported on
+    its own future without affecting the rest of the batch.
+    Non-transactional jobs (e.g. checkpoints) run after the batch commits.
+    A batch that fails as a whole (SQLite rolled it back on its own) fails
+    every future in it; if the thread itself dies, `submit` raises.
+    """
+
+    def __init__(self, max_batch: int, max_wait_ms: int) -> None:
+        self._max_batch = max(1, max_batch)
+        self._max_wait = max(0, max_wait_ms) / 1000.0
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._startup_error: Optional[BaseException] = None
+        self._queue_delay = 0.0
+        # Set when the writer thread dies; later submissions fail fast
+        self._failure: Optional[BaseException] = None
+
+    # ----------------------------
+    # Lifecycle
+    # ----------------------------
+    def start(
+        self,
+        db_path: str,
+        timeout: float,
+        wal_mode: bool,
+        pragmas: Sequence[str] = (),
+    ) -> None:
+        """
+        Start the writer thread and wait until its connection is open.
+        `pragmas` are executed once on the new connection.
+        """
+        if self._thread is not None:
+            raise RuntimeError("Writer already started")
+
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(db_path, timeout, wal_mode, pragmas),
+            name="presenz-db-writer",
+            daemon=True,
+        )
+        self._thread.start()
+        self._ready.wait()
+
+        if self._startup_error is not None:
+            self._thread.join()
+            self._thread = None
+            raise self._startup_error
+
+    def stop(self) -> None:
+        """Flush pending jobs, close the connection and join the thread."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    # ----------------------------
+    # Submission
+    # ----------------------------
+    def submit(self, job: Job, transactional: bool = True) -> Future:
+        """
+        Queue a job; the returned future resolves after its batch commits.
+        With transactional=False the job runs in autocommit mode once the
+        batch it landed in has committed.
+        """
+        if self._thread is None:
+            raise RuntimeError("Writer not started")
+        if self._failure is not None:
+            raise RuntimeError("Writer thread stopped") from self._failure
+        future: Future = Future()
+        self._queue.put((job, future, transactional, time.monotonic()))
+        if self._failure is not None:
+            # The thread died between the check and the put
+            self._drain(self._failure)
+        return future
+
+    def execute(self, query: str, params: Tuple = ()) -> Future:
+        """Queue a single statement; resolves with the cursor's lastrowid."""
+        return self.submit(lambda conn: conn.execute(query, params).lastrowid)
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs waiting for the writer thread (approximate)."""
+        return self._queue.qsize()
+
+    @property
+    def queue_delay(self) -> float:
+        """
+        Shortest time a job of the last batch spent queued, in seconds, or
+        0 while the queue is empty. It stays high only while a queue
+        persists from batch to batch.
+        """
+        return self._queue_delay if self._queue.qsize() else 0.0
+
+    # ----------------------------
+    # Writer thread
+    # ----------------------------
+    def _run(self, db_path: str, timeout: float, wal_mode: bool, pragmas: Sequence[str]) -> None:
+        try:
+            # isolation_level=None: transactions are managed explicitly below
+            conn = sqlite3.connect(db_path, timeout=timeout, isolation_level=None)
+            if wal_mode:
+                conn.execute("PRAGMA journal_mode=WAL;")
+            for statement in pragmas:
+                conn.execute(statement)
+        except BaseException as e:
+            self._startup_error = e
+            self._ready.set()
+            return
+
+        self._ready.set()
+
+        batch: List[Item] = []
+        try:
+            stopping = False
+            while not stopping:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+
+                batch, stopping = self._collect(item)
+                # FIFO: the newest job of the batch waited the least
+                self._queue_delay = time.monotonic() - batch[-1][3]
+                metrics_service.observe_stage("queue_wait", self._queue_delay)
+                try:
+                    self._flush(conn, batch)
+                except Exception as e:
+                    # e.g. SQLITE_FULL/IOERR rolled the transaction back under us
+                    print("[ERROR] DB writer batch failed:", e)
+                    self._abort(conn, batch, e)
+        except BaseException as e:
+            self._failure = e
+            stopped = RuntimeError(f"Writer thread stopped: {e}")
+            for _, fut, _, _ in batch:
+                if not fut.done():
+                    fut.set_exception(stopped)
+            self._drain(e)
+            raise
+        finally:
+            conn.close()
+
+    def _collect(self, first: Item) -> Tuple[List[Item], bool]:
+        """Gather up to `max_batch` jobs, waiting at most `max_wait` for stragglers."""
+        batch = [first]
+        deadline = time.monotonic() + self._max_wait
+
+        while len(batch) < self._max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+
+        return batch, False
+
+    def _flush(self, conn: sqlite3.Connection, batch: List[Item]) -> None:
+        self._flush_transaction(conn, [
+            (job, fut) for job, fut, transactional, _ in batch
+            if transactional and fut.set_running_or_notify_cancel()
+        ])
+
+        for job, fut, transactional, _ in batch:
+            if transactional or not fut.set_running_or_notify_cancel():
+                continue
+            try:
+                fut.set_result(job(conn))
+            except Exception as e:
+                fut.set_exception(e)
+
+    def _flush_transaction(self, conn: sqlite3.Connection, pending: List[Tuple[Job, Future]]) -> None:
+        if not pending:
+            return
+
+        try:
+            self._execute_retrying(conn, "BEGIN IMMEDIATE;")
+        except Exception as e:
+            for _, fut in pending:
+                fut.set_exception(e)
+            return
+
+        outcomes = []
+        for job, fut in pending:
+            try:
+                conn.execute("SAVEPOINT job;")
+                result = job(conn)
+                conn.execute("RELEASE job;")
+                outcomes.append((fut, result, None))
+            except Exception as e:
+                if not conn.in_transaction:
+                    # SQLite already rolled back the whole batch: fail all of it
+                    raise
+                conn.execute("ROLLBACK TO job;")
+                conn.execute("RELEASE job;")
+                outcomes.append((fut, None, e))
+
+        started = time.perf_counter()
+        try:
+            self._execute_retrying(conn, "COMMIT;")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK;")
+            for fut, _, error in outcomes:
+                fut.set_exception(error or e)
+            return
+
+        metrics_service.observe_stage("commit", time.perf_counter() - started)
+        metrics_service.batch_size.observe(len(outcomes))
+
+        for fut, result, error in outcomes:
+            if error is not None:
+                fut.set_exception(error)
+            else:
+                fut.set_result(result)
+
+    def _abort(self, conn: sqlite3.Connection, batch: List[Item], error: Exception) -> None:
+        """Roll back what is left of a failed batch and fail its unresolved futures."""
+        if conn.in_transaction:
+            try:
+                conn.execute("ROLLBACK;")
+            except sqlite3.Error as e:
+                print("[ERROR] DB writer rollback failed:", e)
+        for _, fut, _, _ in batch:
+            if not fut.done():
+                fut.set_exception(error)
+
+    def _drain(self, error: BaseException) -> None:
+        """Fail every queued job; used once the writer thread is gone."""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP and not item[1].done():
+                item[1].set_exception(RuntimeError(f"Writer thread stopped: {error}"))
+
+    def _execute_retrying(self, conn: sqlite3.Connection, statement: str) -> None:
+        """
+        Run a transaction statement, retrying a few times on SQLITE_BUSY or
+        SQLITE_LOCKED. A busy COMMIT leaves the transaction open, so
+        retrying it is safe.
+        """
+        for attempt in range(LOCK_RETRIES + 1):
+            try:
+                conn.execute(statement)
+                return
+            except sqlite3.OperationalError as e:
+                kind = lock_error(e)
+                if kind is None or attempt == LOCK_RETRIES:
+                    raise
+                metrics_service.sqlite_retries.inc(kind)
+                time.sleep(LOCK_RETRY_SLEEP * (attempt + 1))
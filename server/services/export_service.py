@@ -1,36 +1,127 @@
 # server/services/export_service.py
 
+import csv
+import io
 import json
+from itertools import islice
 from pathlib import Path
-from typing import List, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from server.config import settings
+from server.services.db_service import db_service
+
+FIELDS = ("name", "roll", "timestamp")
+
+MEDIA_TYPES: Dict[str, str] = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _chunks(records: Iterable[Tuple], size: int) -> Iterator[List[Tuple]]:
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
 
 
 class ExportService:
-    def export_json(
+    # ----------------------------
+    # Encoders
+    # ----------------------------
+    def _encode_json(self, records: Iterable[Tuple], chunk_size: int) -> Iterator[str]:
+        dumps = json.dumps
+        yield "["
+        separator = "\n"
+        for chunk in _chunks(records, chunk_size):
+            parts = [dumps(dict(zip(FIELDS, r))) for r in chunk]
+            yield separator + ",\n".join(parts)
+            separator = ",\n"
+        yield "\n]\n"
+
+    def _encode_ndjson(self, records: Iterable[Tuple], chunk_size: int) -> Iterator[str]:
+        dumps = json.dumps
+        for chunk in _chunks(records, chunk_size):
+            yield "".join(dumps(dict(zip(FIELDS, r))) + "\n" for r in chunk)
+
+    def _encode_csv(self, records: Iterable[Tuple], chunk_size: int) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(FIELDS)
+        for chunk in _chunks(records, chunk_size):
+            writer.writerows(chunk)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    # ----------------------------
+    # Streaming pipeline
+    # ----------------------------
+    def resolve_format(self, fmt: Optional[str]) -> str:
+        fmt = (fmt or settings.export_format).lower()
+        if fmt not in MEDIA_TYPES:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        return fmt
+
+    def stream(
+        self,
+        records: Iterable[Tuple],
+        fmt: Optional[str] = None,
+    ) -> Iterator[str]:
+        """
+        Encode rows incrementally; memory stays bounded by one chunk.
+        """
+        encoders: Dict[str, Callable] = {
+            "json": self._encode_json,
+            "ndjson": self._encode_ndjson,
+            "csv": self._encode_csv,
+        }
+        return encoders[self.resolve_format(fmt)](records, settings.export_chunk_rows)
+
+    def stream_table(self, table_name: str, fmt: Optional[str] = None) -> Iterator[str]:
+        records = db_service.iter_rows(table_name, settings.export_chunk_rows)
+        return self.stream(records, fmt)
+
+    # ----------------------------
+    # File export
+    # ----------------------------
+    def export_file(
         self,
         table_name: str,
-        records: List[Tuple],
+        records: Optional[Iterable[Tuple]] = None,
+        fmt: Optional[str] = None,
     ) -> str:
+        """
+        Write a table export to the backup directory and return its path.
+        Streams from the DB cursor unless `records` is given.
+        """
+        fmt = self.resolve_format(fmt)
+
         backup_dir = Path(settings.backup_path)
         backup_dir.mkdir(parents=True, exist_ok=True)
 
-        export_path = backup_dir / f"{table_name}.json"
+        export_path = backup_dir / f"{table_name}.{fmt}"
 
-        structured = [
-            {
-                "name": r[0],
-                "roll": r[1],
-                "timestamp": r[2],
-            }
-            for r in records
-        ]
+        if records is None:
+            records = db_service.iter_rows(table_name, settings.export_chunk_rows)
 
-        with export_path.open("w", encoding="utf-8") as f:
-            json.dump(structured, f, indent=4)
+        with export_path.open("w", encoding="utf-8", newline="") as f:
+            for part in self.stream(records, fmt):
+                f.write(part)
 
         return str(export_path)
 
+    def export_json(
+        self,
+        table_name: str,
+        records: Optional[Iterable[Tuple]] = None,
+    ) -> str:
+        return self.export_file(table_name, records, "json")
+
 
-export_service = ExportService()
\ No newline at end of file
+export_service = ExportService()
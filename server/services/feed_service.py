@@ -0,0 +1,38 @@
+# server/services/feed_service.py
+
+import asyncio
+from typing import Dict, Set
+
+
+class FeedService:
+    """
+    Wakes live roster subscribers (SSE streams) when a session accepts
+    a submission. Subscribers then read only the rows past their id
+    cursor, so a notification carries no payload and a slow consumer
+    can never build up a backlog.
+
+    Runs on the event loop; notify() and subscribe() are not thread-safe.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: Dict[str, Set[asyncio.Event]] = {}
+
+    def subscribe(self, session_code: str) -> asyncio.Event:
+        event = asyncio.Event()
+        self._subscribers.setdefault(session_code, set()).add(event)
+        return event
+
+    def unsubscribe(self, session_code: str, event: asyncio.Event) -> None:
+        subscribers = self._subscribers.get(session_code)
+        if subscribers is None:
+            return
+        subscribers.discard(event)
+        if not subscribers:
+            del self._subscribers[session_code]
+
+    def notify(self, session_code: str) -> None:
+        for event in self._subscribers.get(session_code, ()):
+            event.set()
+
+
+feed_service = FeedService()
@@ -0,0 +1,110 @@
+# server/services/idempotency_service.py
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from server.config import settings
+
+
+class IdempotencyConflictError(Exception):
+    """The key was already used for a different request body."""
+
+
+class StoredResponse(NamedTuple):
+    status_code: int
+    content: Any
+    fingerprint: bytes
+    expires_at: float
+
+
+class IdempotencyService:
+    """
+    Remembers the final response of submissions sent with an
+    Idempotency-Key so a client retry gets the original answer instead
+    of reaching SQLite (and a 409) again.
+
+    Entries expire `ttl_seconds` after completion and at most
+    `max_entries` are kept; both are read from settings on use. Entries
+    are never refreshed, so insertion order is expiry order and the
+    oldest one is always at the front.
+
+    A retry that arrives while the first request is still running waits
+    for it. Only 2xx/4xx answers are stored: after a 5xx, or when the
+    first request is cancelled, the next request with the key runs anew.
+
+    Runs on the event loop; not thread-safe. With --workers every
+    process keeps its own cache.
+    """
+
+    def __init__(self) -> None:
+        self._done: "OrderedDict[str, StoredResponse]" = OrderedDict()
+        self._in_flight: Dict[str, Tuple[bytes, asyncio.Future]] = {}
+
+    # ----------------------------
+    # Lookup
+    # ----------------------------
+    async def begin(self, key: str, body: bytes) -> Optional[StoredResponse]:
+        """
+        The stored response for `key`, or None when the caller now owns
+        the key and must end with `complete` or `abandon`.
+        """
+        fingerprint = hashlib.blake2b(body, digest_size=16).digest()
+        while True:
+            stored = self._get(key)
+            if stored is not None:
+                if stored.fingerprint != fingerprint:
+                    raise IdempotencyConflictError("Idempotency-Key was used with a different request")
+                return stored
+
+            running = self._in_flight.get(key)
+            if running is None:
+                self._in_flight[key] = (fingerprint, asyncio.get_running_loop().create_future())
+                return None
+
+            if running[0] != fingerprint:
+                raise IdempotencyConflictError("Idempotency-Key was used with a different request")
+            # Shielded: a retry that disconnects must not cancel the owner's future
+            await asyncio.shield(running[1])
+
+    def _get(self, key: str) -> Optional[StoredResponse]:
+        stored = self._done.get(key)
+        if stored is not None and stored.expires_at <= time.monotonic():
+            del self._done[key]
+            return None
+        return stored
+
+    # ----------------------------
+    # Completion
+    # ----------------------------
+    def complete(self, key: str, status_code: int, content: Any) -> None:
+        fingerprint, future = self._in_flight.pop(key)
+        now = time.monotonic()
+        self._done[key] = StoredResponse(
+            status_code, content, fingerprint, now + settings.idempotency_ttl_seconds,
+        )
+        self._evict(now)
+        future.set_result(None)
+
+    def abandon(self, key: str) -> None:
+        _, future = self._in_flight.pop(key)
+        future.set_result(None)
+
+    def _evict(self, now: float) -> None:
+        max_entries = settings.idempotency_max_entries
+        while self._done:
+            oldest = next(iter(self._done.values()))
+            if len(self._done) <= max_entries and oldest.expires_at > now:
+                break
+            self._done.popitem(last=False)
+
+    # ----------------------------
+    # Status
+    # ----------------------------
+    def __len__(self) -> int:
+        return len(self._done)
+
+
+idempotency_service = IdempotencyService()
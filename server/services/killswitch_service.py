@@ -1,21 +1,102 @@
 # server/services/killswitch_service.py
 
 import asyncio
+import inspect
+import time
 from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from server.services.db_service import db_service
+from server.services.session_service import Session, session_service
+
+CommandHandler = Callable[[List[str]], Any]
+
+# Shared-mode sessions fill up in worker processes, which cannot wake
+# this process's scheduler; it re-reads their counters this often.
+SHARED_CAPACITY_POLL_SECONDS = 5.0
+# Retry delay after a checkpoint that readers kept from completing
+CHECKPOINT_RETRY_SECONDS = 5.0
+
+_monotonic = time.monotonic
+
+
+class ActivityClock:
+    """
+    Process-local holder for the last activity time (time.monotonic()).
+    Worker processes share a multiprocessing.Value("d") with the same
+    `.value` interface instead; the monotonic clock is system-wide, so
+    their stamps compare directly with the parent's.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = _monotonic()
+
+
+def seconds_until(clock_time: str) -> float:
+    """Seconds from now until the next local "HH:MM" (today or tomorrow)."""
+    target = datetime.strptime(clock_time, "%H:%M").time()
+    now = datetime.now()
+    when = datetime.combine(now.date(), target)
+    if when <= now:
+        when += timedelta(days=1)
+    return (when - now).total_seconds()
 
 
 class KillSwitchService:
-    def __init__(self, timeout_minutes: int = 3) -> None:
-        # Shared shutdown event for both inactivity and manual terminate
+    """
+    Shutdown paths (operator command and a set of deadlines) plus the
+    operator command listener.
+
+    Deadlines live on the monotonic clock, so wall-clock jumps cannot
+    fire or postpone them; a scheduled close time is converted once at
+    startup. The monitor sleeps until the earliest deadline and is
+    woken early only when a deadline changes (e.g. a session fills).
+    """
+
+    def __init__(
+        self,
+        timeout_minutes: float = 3,
+        activity: Optional[Any] = None,
+        idle_checkpoint_seconds: int = 0,
+        max_duration_minutes: float = 0,
+        close_at: str = "",
+        close_at_capacity: bool = False,
+        capacity_grace_seconds: int = 60,
+    ) -> None:
+        # Shared shutdown event for every deadline and manual terminate
         self._shutdown_event = asyncio.Event()
-        self._last_activity = datetime.utcnow()
-        self._timeout = timedelta(minutes=timeout_minutes)
+        # Set whenever a deadline moves earlier than the monitor's sleep
+        self._wake = asyncio.Event()
+        self._activity = activity if activity is not None else ActivityClock()
+        self._activity.value = _monotonic()
+        self._started = _monotonic()
+        # Extra operator commands read by the terminal listener
+        self._commands: Dict[str, CommandHandler] = {}
+
+        # Deadlines (seconds; 0 / empty disables)
+        self._idle_timeout = timeout_minutes * 60
+        self._max_duration = max_duration_minutes * 60
+        self._close_deadline = self._started + seconds_until(close_at) if close_at else None
+        self._close_at_capacity = close_at_capacity
+        self._capacity_grace = capacity_grace_seconds
+        self._capacity_deadline: Optional[float] = None
+        self._capacity_poll_at: Optional[float] = None
+
+        # WAL checkpoint once requests have been quiet this long (0 disables)
+        self._idle_checkpoint = idle_checkpoint_seconds
+        self._checkpointed_at = 0.0
+        self._checkpoint_retry_at = 0.0
+
+        if close_at_capacity:
+            session_service.add_fill_listener(self._on_session_filled)
 
     # ----------------------------
     # Manual / shared shutdown
     # ----------------------------
     def trigger_shutdown(self) -> None:
-        """Trigger shutdown (used by both inactivity and manual terminate)."""
+        """Trigger shutdown (used by every deadline and manual terminate)."""
         if not self._shutdown_event.is_set():
             self._shutdown_event.set()
             print("+-----------------------------------------+")
@@ -26,38 +107,151 @@ class KillSwitchService:
         """Wait until any shutdown path fires."""
         await self._shutdown_event.wait()
 
+    def register_command(self, name: str, handler: CommandHandler) -> None:
+        """
+        Register an operator command for the terminal listener.
+        The handler receives the remaining words and may be sync or async.
+        """
+        self._commands[name.lower()] = handler
+
     async def manual_terminate_listener(self) -> None:
         """
-        Wait for user to type 'terminate' in the terminal.
-        Works even when inactivity monitor is running.
+        Wait for user to type 'terminate' (or a registered command)
+        in the terminal. Works even when the deadline monitor is running.
         """
         while not self._shutdown_event.is_set():
             try:
                 cmd = await asyncio.to_thread(input, "")
-                if cmd.strip().lower() == "terminate":
+                parts = cmd.strip().split()
+                if not parts:
+                    continue
+
+                name, args = parts[0].lower(), parts[1:]
+                if name == "terminate":
                     print("[KillSwitch] 'terminate' command received.")
                     self.trigger_shutdown()
                     break
-            except Exception:
-                # Ignore input errors and keep listening
+
+                handler = self._commands.get(name)
+                if handler is None:
+                    known = ", ".join(["terminate", *sorted(self._commands)])
+                    print(f"[KillSwitch] Unknown command '{name}'. Available: {known}")
+                    continue
+
+                result = handler(args)
+                if inspect.isawaitable(result):
+                    await result
+            except EOFError:
+                # No terminal attached (e.g. detached container): stop listening
+                break
+            except Exception as e:
+                # Report command errors and keep listening
+                print("[ERROR] Command failed:", e)
                 continue
 
     # ----------------------------
-    # Inactivity tracking
+    # Activity and deadlines
     # ----------------------------
     def update_activity(self) -> None:
-        """Update last activity timestamp on each HTTP request."""
-        self._last_activity = datetime.utcnow()
+        """Called on each HTTP request: a single float store."""
+        self._activity.value = _monotonic()
+
+    def _on_session_filled(self, session: Optional[Session]) -> None:
+        """Fill listener: arm the capacity deadline once every session is full."""
+        if self._capacity_deadline is None and self._all_sessions_full():
+            self._capacity_deadline = _monotonic() + self._capacity_grace
+            print(f"[KillSwitch] All sessions full; closing in {self._capacity_grace}s.")
+            self._wake.set()
 
-    async def inactivity_monitor(self) -> None:
+    def _all_sessions_full(self) -> bool:
+        sessions = session_service.sessions()
+        return bool(sessions) and all(s.is_full() for s in sessions)
+
+    def _deadlines(self) -> List[Tuple[float, str]]:
+        """Pending (monotonic time, name) pairs."""
+        last_activity = self._activity.value
+        deadlines = []
+        if self._idle_timeout:
+            deadlines.append((last_activity + self._idle_timeout, "idle"))
+        if self._max_duration:
+            deadlines.append((self._started + self._max_duration, "max_duration"))
+        if self._close_deadline is not None:
+            deadlines.append((self._close_deadline, "close_at"))
+        if self._capacity_deadline is not None:
+            deadlines.append((self._capacity_deadline, "capacity"))
+        if self._capacity_poll_at is not None:
+            deadlines.append((self._capacity_poll_at, "capacity_poll"))
+        if self._idle_checkpoint and last_activity > self._checkpointed_at:
+            when = max(last_activity + self._idle_checkpoint, self._checkpoint_retry_at)
+            deadlines.append((when, "checkpoint"))
+        return deadlines
+
+    async def deadline_monitor(self) -> None:
         """
-        Periodically check for inactivity.
-        If no activity for timeout_minutes, trigger shutdown.
+        Sleep until the earliest deadline, act on whichever are due, repeat.
+        An idle deadline that passes after new activity simply moves on.
         """
-        print(f"[KillSwitch] Inactivity monitor started (timeout: {self._timeout}).")
+        print(
+            f"[KillSwitch] Deadline monitor started (idle timeout: {timedelta(seconds=self._idle_timeout) if self._idle_timeout else 'off'}"
+            + (f", max duration: {timedelta(seconds=self._max_duration)}" if self._max_duration else "")
+            + (f", closing in {timedelta(seconds=int(self._close_deadline - self._started))}" if self._close_deadline else "")
+            + ")."
+        )
+        if self._close_at_capacity and session_service.shared:
+            self._capacity_poll_at = _monotonic() + SHARED_CAPACITY_POLL_SECONDS
+
         while not self._shutdown_event.is_set():
-            await asyncio.sleep(5)
-            if datetime.utcnow() - self._last_activity > self._timeout:
-                print("[KillSwitch] Inactivity timeout reached. Shutting down.")
+            now = _monotonic()
+            for when, name in self._deadlines():
+                if when <= now:
+                    await self._fire(name, now)
+            if self._shutdown_event.is_set():
+                break
+
+            pending = [when for when, _ in self._deadlines()]
+            timeout = max(0.0, min(pending) - _monotonic()) if pending else None
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fire(self, name: str, now: float) -> None:
+        if name == "idle":
+            print("[KillSwitch] Inactivity timeout reached. Shutting down.")
+            self.trigger_shutdown()
+        elif name == "max_duration":
+            print("[KillSwitch] Maximum session duration reached. Shutting down.")
+            self.trigger_shutdown()
+        elif name == "close_at":
+            print("[KillSwitch] Scheduled close time reached. Shutting down.")
+            self.trigger_shutdown()
+        elif name == "capacity":
+            self._capacity_deadline = None
+            # A session opened during the grace period keeps the server up
+            if self._all_sessions_full():
+                print("[KillSwitch] All sessions reached capacity. Shutting down.")
                 self.trigger_shutdown()
-                break
\ No newline at end of file
+        elif name == "capacity_poll":
+            self._capacity_poll_at = now + SHARED_CAPACITY_POLL_SECONDS
+            self._on_session_filled(None)
+        elif name == "checkpoint":
+            # Once per quiet period, so checkpoints stay off the request path
+            last_activity = self._activity.value
+            if await self._checkpoint():
+                self._checkpointed_at = last_activity
+            else:
+                self._checkpoint_retry_at = _monotonic() + CHECKPOINT_RETRY_SECONDS
+
+    async def _checkpoint(self) -> bool:
+        """TRUNCATE checkpoint; False when it failed or readers blocked it."""
+        try:
+            busy, wal_pages, _ = await db_service.checkpoint_async("TRUNCATE")
+        except Exception as e:
+            print("[ERROR] Idle checkpoint failed:", e)
+            return False
+        if busy:
+            return False
+        if wal_pages > 0:
+            print(f"[KillSwitch] Idle checkpoint: {wal_pages} WAL pages written back.")
+        return True
\ No newline at end of file
@@ -0,0 +1,179 @@
+# server/services/metrics_service.py
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Seconds; spans a sub-millisecond validation up to a stalled commit
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+OUTCOMES = ("success", "duplicate", "closed", "invalid_code", "invalid", "throttled", "shed", "replayed", "error")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with a fixed label set chosen at registration."""
+
+    def __init__(self, name: str, help_text: str, label: Optional[str] = None) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self._values: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_value: str = "", amount: int = 1) -> None:
+        with self._lock:
+            self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_value, value in values:
+            labels = f'{{{self.label}="{label_value}"}}' if self.label else ""
+            lines.append(f"{self.name}{labels} {value}")
+        return lines
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram. Observing is one bisect and three
+    additions under a lock, cheap enough for every request.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label: Optional[str] = None,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self._bounds = tuple(buckets)
+        # label value -> [per-bucket counts..., +Inf count], sum, count
+        self._series: Dict[str, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, label_value: str = "") -> None:
+        index = bisect_left(self._bounds, value)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = ([0] * (len(self._bounds) + 1), [0.0, 0])
+                self._series[label_value] = series
+            counts, totals = series
+            counts[index] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [
+                (label_value, list(counts), list(totals))
+                for label_value, (counts, totals) in sorted(self._series.items())
+            ]
+        for label_value, counts, (total, count) in snapshot:
+            prefix = f'{self.label}="{label_value}",' if self.label else ""
+            cumulative = 0
+            for bound, bucket_count in zip(self._bounds + (float("inf"),), counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{_format_value(bound)}"}} {cumulative}')
+            labels = f"{{{prefix.rstrip(',')}}}" if prefix else ""
+            lines.append(f"{self.name}_sum{labels} {total!r}")
+            lines.append(f"{self.name}_count{labels} {int(count)}")
+        return lines
+
+
+class MetricsService:
+    """
+    In-process metrics rendered in the Prometheus text format.
+
+    Counters and histograms are per process: with --workers each scrape
+    reports the worker that answered it.
+    """
+
+    def __init__(self) -> None:
+        self.requests = Counter(
+            "presenz_http_requests_total", "HTTP requests by response status class.", "status",
+        )
+        self.request_latency = Histogram(
+            "presenz_http_request_duration_seconds", "Time from request start to response start.",
+        )
+        self.submissions = Counter(
+            "presenz_submissions_total", "Attendance submissions by outcome.", "outcome",
+        )
+        self.stage_latency = Histogram(
+            "presenz_submit_stage_duration_seconds", "Latency of each submit stage.", "stage",
+        )
+        self.batch_size = Histogram(
+            "presenz_db_batch_size", "Jobs committed per group-commit transaction.",
+            buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+        )
+        self.sqlite_retries = Counter(
+            "presenz_sqlite_retries_total", "Writer retries after SQLITE_BUSY/SQLITE_LOCKED.", "error",
+        )
+        for outcome in OUTCOMES:
+            self.submissions.inc(outcome, 0)
+        self._gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+        self._started = time.time()
+
+    # ----------------------------
+    # Recording
+    # ----------------------------
+    def count_outcome(self, outcome: str) -> None:
+        self.submissions.inc(outcome)
+
+    def observe_stage(self, stage: str, seconds: float) -> None:
+        self.stage_latency.observe(seconds, stage)
+
+    def observe_request(self, status: int, seconds: float) -> None:
+        self.requests.inc(f"{status // 100}xx")
+        self.request_latency.observe(seconds)
+
+    def register_gauge(self, name: str, help_text: str, read: Callable[[], float]) -> None:
+        """Gauges are read lazily at scrape time; `read` must not block."""
+        self._gauges[name] = (help_text, read)
+
+    # ----------------------------
+    # Exposition
+    # ----------------------------
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in (
+            self.requests,
+            self.request_latency,
+            self.submissions,
+            self.stage_latency,
+            self.batch_size,
+            self.sqlite_retries,
+        ):
+            lines.extend(metric.render())
+
+        for name, (help_text, read) in sorted(self._gauges.items()):
+            try:
+                value = read()
+            except Exception:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format_value(value)}")
+
+        lines.append("# HELP presenz_process_start_time_seconds Start time of this process.")
+        lines.append("# TYPE presenz_process_start_time_seconds gauge")
+        lines.append(f"presenz_process_start_time_seconds {self._started!r}")
+        return "\n".join(lines) + "\n"
+
+
+metrics_service = MetricsService()
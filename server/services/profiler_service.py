@@ -0,0 +1,186 @@
+# server/services/profiler_service.py
+
+import cProfile
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, List, Optional, Tuple
+
+from server.config import settings
+
+# (wall time, outcome, validation, capacity, db_insert); stages in seconds or None
+StageTrace = Tuple[float, str, Optional[float], Optional[float], Optional[float]]
+
+MODES = ("sample", "cprofile")
+
+
+def _fold(frame, thread_name: str) -> str:
+    """One stack as `thread;outer;...;inner`, the folded-stack format."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    names.append(thread_name)
+    return ";".join(reversed(names))
+
+
+class ProfilerService:
+    """
+    Operator-toggled profiling of the running server.
+
+    While enabled, submit_attendance records per-request stage timings
+    and, depending on the mode, either a background thread samples every
+    thread's stack each `interval_ms` ("sample") or cProfile instruments
+    the event loop thread ("cprofile"). Both go into bounded buffers.
+    When disabled the only cost on the request path is reading `enabled`.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._mode: Optional[str] = None
+        # Sized from settings on `start`, so importing this module reads no config
+        self._traces: Deque[StageTrace] = deque(maxlen=0)
+        self._samples: Deque[str] = deque(maxlen=0)
+        self._sampler: Optional[threading.Thread] = None
+        self._stop_sampler = threading.Event()
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._started = 0.0
+
+    # ----------------------------
+    # Toggle
+    # ----------------------------
+    def start(self, mode: str = "sample") -> None:
+        """Start profiling. "cprofile" must be called on the event loop thread."""
+        if self.enabled:
+            raise RuntimeError(f"Profiler already running ({self._mode})")
+        if mode not in MODES:
+            raise ValueError(f"Unsupported profile mode: {mode}")
+
+        self._traces = deque(maxlen=settings.profile_max_traces)
+        self._samples = deque(maxlen=settings.profile_max_samples)
+        self._cprofile = None
+
+        if mode == "sample":
+            self._stop_sampler.clear()
+            self._sampler = threading.Thread(
+                target=self._sample_loop,
+                args=(settings.profile_interval_ms / 1000.0,),
+                name="presenz-profiler",
+                daemon=True,
+            )
+            self._sampler.start()
+        else:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+        self._mode = mode
+        self._started = time.time()
+        self.enabled = True
+
+    def stop(self) -> None:
+        if not self.enabled:
+            return
+        self.enabled = False
+        if self._sampler is not None:
+            self._stop_sampler.set()
+            self._sampler.join()
+            self._sampler = None
+        if self._cprofile is not None:
+            self._cprofile.disable()
+
+    # ----------------------------
+    # Recording
+    # ----------------------------
+    def trace(
+        self,
+        outcome: str,
+        validation: Optional[float],
+        capacity: Optional[float],
+        db_insert: Optional[float],
+    ) -> None:
+        """Called only while enabled; deque appends are thread-safe."""
+        self._traces.append((time.time(), outcome, validation, capacity, db_insert))
+
+    def _sample_loop(self, interval: float) -> None:
+        own = threading.get_ident()
+        while not self._stop_sampler.wait(interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    self._samples.append(_fold(frame, names.get(ident, str(ident))))
+
+    # ----------------------------
+    # Dump
+    # ----------------------------
+    def dump(self, directory: Optional[str] = None) -> List[str]:
+        """
+        Write what has been collected so far; returns the written paths.
+          *.stages.folded   per-stage time in microseconds (flamegraph.pl input)
+          *.stages.tsv      one line per traced request
+          *.samples.folded  sampled stacks ("sample" mode)
+          *.pstats          cProfile stats ("cprofile" mode, after `profile off`)
+        """
+        target = Path(directory or settings.profile_path)
+        target.mkdir(parents=True, exist_ok=True)
+        stem = target / f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        written = []
+
+        traces = list(self._traces)
+        if traces:
+            folded: Counter = Counter()
+            for _, outcome, *stages in traces:
+                for stage, seconds in zip(("validation", "capacity", "db_insert"), stages):
+                    if seconds is not None:
+                        folded[f"submit;{outcome};{stage}"] += int(seconds * 1_000_000)
+            path = f"{stem}.stages.folded"
+            self._write_folded(path, folded)
+            written.append(path)
+
+            path = f"{stem}.stages.tsv"
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("time\toutcome\tvalidation_s\tcapacity_s\tdb_insert_s\n")
+                for wall, outcome, *stages in traces:
+                    cells = ["" if s is None else f"{s:.6f}" for s in stages]
+                    f.write(f"{wall:.6f}\t{outcome}\t" + "\t".join(cells) + "\n")
+            written.append(path)
+
+        samples = list(self._samples)
+        if samples:
+            path = f"{stem}.samples.folded"
+            self._write_folded(path, Counter(samples))
+            written.append(path)
+
+        if self._cprofile is not None:
+            if self.enabled:
+                print("[Profiler] cProfile stats are written after `profile off`.")
+            else:
+                path = f"{stem}.pstats"
+                self._cprofile.dump_stats(path)
+                written.append(path)
+
+        return written
+
+    def _write_folded(self, path: str, folded: Counter) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, weight in folded.most_common():
+                if weight > 0:
+                    f.write(f"{stack} {weight}\n")
+
+    # ----------------------------
+    # Status
+    # ----------------------------
+    @property
+    def mode(self) -> Optional[str]:
+        return self._mode
+
+    def status(self) -> str:
+        state = f"on ({self._mode}, {time.time() - self._started:.0f}s)" if self.enabled else "off"
+        return f"{state}, {len(self._traces)} request traces, {len(self._samples)} stack samples"
+
+
+profiler_service = ProfilerService()
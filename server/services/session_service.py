@@ -1,22 +1,255 @@
 # server/services/session_service.py
 
+import asyncio
+import os
 import secrets
 import string
+import threading
+import time
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 from server.config import settings
+from server.services.db_service import db_service
+
+# Shared mode: an unknown code re-reads the active sessions at most this
+# often, so a flood of bad codes costs one SQLite read per interval
+MISS_REFRESH_SECONDS = 1.0
+
+
+class Session:
+    """
+    One attendance session: its code, table, capacity counters and roll index.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        session_code: str,
+        table_name: str,
+        max_count: int,
+        course: str,
+        batch: str,
+        shared: bool = False,
+    ) -> None:
+        self._session_id = session_id
+        self._session_code = session_code
+        self._table_name = table_name
+        self._course = course
+        self._batch = batch
+        self._active: bool = True
+        self._max_count: int = max_count
+        self._current_count: int = 0
+        self._reserved: int = 0
+
+        # Shared sessions keep their authoritative counter in SQLite so
+        # several worker processes enforce the same limit; the local
+        # counter is then only a cache of the last known value.
+        self._shared = shared
+
+        # Guards the reserve/commit/release bookkeeping only; the
+        # "closed" check below reads the counters without it.
+        self._capacity_lock = threading.Lock()
+
+        # Rolls recorded in this session; checked before any DB work
+        self._rolls: Set[str] = set()
+        # Rolls whose insert is still in flight -> resolves True once
+        # recorded, False when the insert failed
+        self._pending_rolls: Dict[str, asyncio.Future] = {}
+        self._rolls_lock = threading.Lock()
+
+    # ----------------------------
+    # Validation
+    # ----------------------------
+    def is_closed(self) -> bool:
+        """Lock-free check: inactive, or every slot already committed."""
+        return not self._active or self._current_count >= self._max_count
+
+    def is_full(self) -> bool:
+        return self._current_count >= self._max_count
+
+    # ----------------------------
+    # Capacity reservation
+    # ----------------------------
+    def try_reserve(self) -> bool:
+        """
+        Reserve a capacity slot before inserting.
+        Returns False when committed + in-flight slots already reach the limit.
+        """
+        if self.is_closed():
+            return False
+        if self._shared:
+            # Enforced atomically by insert() inside the DB transaction. An
+            # over-capacity insert fails with SessionClosedError, which
+            # syncs the cached counter and releases the roll claim, so
+            # copies of the roll waiting in claim_roll answer "closed"
+            # here instead of 409
+            return True
+        with self._capacity_lock:
+            if self._current_count + self._reserved >= self._max_count:
+                return False
+            self._reserved += 1
+            return True
+
+    def commit_reservation(self, count: Optional[int] = None) -> bool:
+        """
+        Turn a reserved slot into a recorded submission.
+        Shared sessions pass the count returned by insert().
+        Returns True only for the commit that filled the session.
+        """
+        if self._shared:
+            with self._capacity_lock:
+                self._current_count = max(self._current_count, count)
+            return count == self._max_count
+        with self._capacity_lock:
+            self._reserved -= 1
+            self._current_count += 1
+            return self._current_count == self._max_count
+
+    def release_reservation(self) -> None:
+        """Give a reserved slot back after a failed insert."""
+        if self._shared:
+            return
+        with self._capacity_lock:
+            self._reserved -= 1
+
+    # ----------------------------
+    # Insert
+    # ----------------------------
+    async def insert(self, name: str, roll: str) -> Tuple[int, Optional[int]]:
+        """
+        Record a submission through the group-commit writer.
+        Returns (row id, shared count); the count is None for local sessions.
+        Raises SessionClosedError when another process filled or closed it.
+        """
+        if self._shared:
+            return await db_service.insert_counted_attendance_async(
+                self._session_code, self._table_name, name, roll,
+            )
+        row_id = await db_service.insert_attendance_async(self._table_name, name, roll)
+        return row_id, None
+
+    def sync(self, current_count: int, active: bool) -> None:
+        """Refresh the cached shared counter and state."""
+        with self._capacity_lock:
+            self._current_count = max(self._current_count, current_count)
+        if not active:
+            self.close()
+
+    # ----------------------------
+    # Roll index
+    # ----------------------------
+    def seed_rolls(self, rolls: Iterable[str]) -> None:
+        """Load rolls already present in the session table."""
+        with self._rolls_lock:
+            self._rolls.update(rolls)
+
+    async def claim_roll(self, roll: str) -> bool:
+        """
+        Claim a roll for one insert; settle it with `confirm_roll` or
+        `release_roll`. Returns False if the roll is already recorded.
+        While another request's insert of the same roll is in flight this
+        waits for it: its success makes this a duplicate, its failure
+        lets this request try instead. Must run on the event loop.
+        """
+        while True:
+            with self._rolls_lock:
+                if roll in self._rolls:
+                    return False
+                pending = self._pending_rolls.get(roll)
+                if pending is None:
+                    self._pending_rolls[roll] = asyncio.get_running_loop().create_future()
+                    return True
+            # Shielded: a waiter that disconnects must not cancel the owner's future
+            await asyncio.shield(pending)
+
+    def confirm_roll(self, roll: str) -> None:
+        """The claimed roll is in the table (inserted, or already there)."""
+        self._settle_roll(roll, True)
+
+    def release_roll(self, roll: str) -> None:
+        """Undo a claim when nothing was recorded for the roll."""
+        self._settle_roll(roll, False)
+
+    def _settle_roll(self, roll: str, recorded: bool) -> None:
+        with self._rolls_lock:
+            pending = self._pending_rolls.pop(roll, None)
+            if recorded:
+                self._rolls.add(roll)
+        if pending is not None and not pending.done():
+            pending.set_result(recorded)
+
+    # ----------------------------
+    # Getters
+    # ----------------------------
+    @property
+    def session_id(self) -> str:
+        return self._session_id
+
+    @property
+    def code(self) -> str:
+        return self._session_code
+
+    @property
+    def table_name(self) -> str:
+        return self._table_name
+
+    @property
+    def course(self) -> str:
+        return self._course
+
+    @property
+    def batch(self) -> str:
+        return self._batch
+
+    @property
+    def max_count(self) -> int:
+        return self._max_count
+
+    @property
+    def current_count(self) -> int:
+        return self._current_count
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    @property
+    def shared(self) -> bool:
+        return self._shared
+
+    def to_dict(self) -> dict:
+        return {
+            "session_code": self._session_code,
+            "table_name": self._table_name,
+            "course": self._course,
+            "batch": self._batch,
+            "count": self._current_count,
+            "max_count": self._max_count,
+            "active": self._active,
+        }
+
+    # ----------------------------
+    # Close
+    # ----------------------------
+    def close(self) -> None:
+        self._active = False
+        with self._rolls_lock:
+            self._rolls = set()
 
 
 class SessionService:
+    """
+    Registry of sessions hosted by this process, keyed by session code.
+    """
+
     def __init__(self) -> None:
-        self._active: bool = False
-        self._session_id: Optional[str] = None
-        self._session_code: Optional[str] = None
-        self._table_name: Optional[str] = None
-        self._max_count: int = 0
-        self._current_count: int = 0
+        self._sessions: Dict[str, Session] = {}
+        self._lock = threading.Lock()
         self._db_path: Optional[str] = None
+        self._shared = False
+        self._next_miss_refresh = 0.0
+        self._fill_listeners: List[Callable[[Session], None]] = []
 
     # ----------------------------
     # Start Session
@@ -27,29 +260,143 @@ class SessionService:
         course: str,
         batch: str,
         db_filename: str,
-    ) -> None:
-        if self._active:
-            raise RuntimeError("Session already active")
-
-        self._session_id = self._generate_token(settings.session_id_length)
-        self._session_code = self._generate_token(settings.session_code_length)
+    ) -> Session:
+        # Safe DB path resolution
+        if "/" in db_filename or ".." in db_filename:
+            raise ValueError("Invalid database filename")
 
         now = datetime.now().strftime("%d-%m-%y-%H%M")
 
         safe_course = self._sanitize_identifier(course)
         safe_batch = self._sanitize_identifier(batch)
 
-        self._table_name = f"{now}-{safe_course}-{safe_batch}"
+        table_name = f"{now}-{safe_course}-{safe_batch}"
 
-        self._max_count = max_count
-        self._current_count = 0
+        with self._lock:
+            if any(s.active and s.table_name == table_name for s in self._sessions.values()):
+                raise RuntimeError(f"Session already active for {table_name}")
 
-        # Safe DB path resolution
-        if "/" in db_filename or ".." in db_filename:
-            raise ValueError("Invalid database filename")
+            session_code = self._generate_token(settings.session_code_length)
+            while session_code in self._sessions:
+                session_code = self._generate_token(settings.session_code_length)
+
+            session = Session(
+                session_id=self._generate_token(settings.session_id_length),
+                session_code=session_code,
+                table_name=table_name,
+                max_count=max_count,
+                course=course,
+                batch=batch,
+                shared=self._shared,
+            )
+            self._sessions[session_code] = session
 
         self._db_path = settings.db_base_path + db_filename
-        self._active = True
+        return session
+
+    def open_session(
+        self,
+        max_count: int,
+        course: str,
+        batch: str,
+        db_filename: Optional[str] = None,
+    ) -> Session:
+        """
+        Start a session and prepare its table and roll index.
+        Used at startup and to open sessions at runtime; defaults to
+        the connected DB file.
+        """
+        if db_filename is None:
+            db_filename = os.path.basename(db_service.db_path)
+        session = self.start_session(max_count, course, batch, db_filename)
+        try:
+            db_service.create_table(
+                session.table_name,
+                course=session.course,
+                batch=session.batch,
+                max_count=session.max_count,
+            )
+            session.seed_rolls(db_service.fetch_rolls(session.table_name))
+            if self._shared:
+                db_service.save_session_state(
+                    session_code=session.code,
+                    session_id=session.session_id,
+                    table_name=session.table_name,
+                    course=session.course,
+                    batch=session.batch,
+                    max_count=session.max_count,
+                    current_count=session.current_count,
+                )
+        except Exception:
+            self.end_session(session.code)
+            raise
+        return session
+
+    def rollover(
+        self,
+        max_count: int,
+        course: str,
+        batch: str,
+        close_code: Optional[str] = None,
+    ) -> Tuple[List[Session], Session]:
+        """
+        Close the running session(s) and open the next one in this warm
+        process: the DB writer, app and tunnel are reused, only a table
+        and a registry entry are created. Closes `close_code` only when
+        given, otherwise every active session.
+        Returns (closed sessions, new session).
+        """
+        if close_code is not None:
+            previous = self.get(close_code)
+            if previous is None:
+                raise KeyError(f"Unknown session code: {close_code}")
+            closing = [previous] if previous.active else []
+        else:
+            closing = self.sessions()
+
+        for session in closing:
+            self.end_session(session.code)
+        return closing, self.open_session(max_count, course, batch)
+
+    # ----------------------------
+    # Shared state (multi-worker)
+    # ----------------------------
+    def enable_shared_state(self) -> None:
+        """
+        Keep session state in SQLite so several worker processes can
+        serve the same sessions. Loads sessions other processes opened.
+        """
+        self._shared = True
+        db_service.create_state_table()
+        for row in db_service.fetch_session_states():
+            self._load_state(row)
+
+    def _load_state(self, row: Tuple) -> Session:
+        code, session_id, table_name, course, batch, max_count, current_count, active = row
+        with self._lock:
+            session = self._sessions.get(code)
+            if session is None:
+                session = Session(
+                    session_id=session_id,
+                    session_code=code,
+                    table_name=table_name,
+                    max_count=max_count,
+                    course=course,
+                    batch=batch,
+                    shared=True,
+                )
+                session.seed_rolls(db_service.fetch_rolls(table_name))
+                self._sessions[code] = session
+        session.sync(current_count, bool(active))
+        return session
+
+    def _refresh(self) -> None:
+        active_codes = set()
+        for row in db_service.fetch_session_states():
+            active_codes.add(self._load_state(row).code)
+        for session in list(self._sessions.values()):
+            if session.active and session.code not in active_codes:
+                session.close()
 
     # ----------------------------
     # Utilities
@@ -62,30 +409,37 @@ class SessionService:
         return "".join(c for c in value.upper() if c.isalnum())
 
     # ----------------------------
-    # Validation
+    # Lookup
     # ----------------------------
-    def validate_session_code(self, code: str) -> bool:
-        return self._active and code == self._session_code
-
-    def can_accept_submission(self) -> bool:
-        return self._active and self._current_count < self._max_count
+    def get(self, code: str) -> Optional[Session]:
+        """
+        O(1) lookup by session code; closed sessions are still returned.
+        In shared mode a miss re-reads the active sessions, which picks up
+        sessions opened by another process, at most once per
+        MISS_REFRESH_SECONDS; other misses are answered from memory.
+        """
+        session = self._sessions.get(code)
+        if session is None and self._shared:
+            now = time.monotonic()
+            if now >= self._next_miss_refresh:
+                self._next_miss_refresh = now + MISS_REFRESH_SECONDS
+                self._refresh()
+                session = self._sessions.get(code)
+        return session
 
-    def increment_count(self) -> None:
-        self._current_count += 1
-
-    def is_full(self) -> bool:
-        return self._current_count >= self._max_count
-
-    # ----------------------------
-    # Getters
-    # ----------------------------
-    @property
-    def get_session_code(self) -> str:
-        return self._session_code
+    def refresh_session(self, session: Session) -> Session:
+        """Shared mode: pull the latest counter for one session (PK lookup)."""
+        if session.shared:
+            rows = db_service.fetch_session_states(session.code)
+            if rows:
+                self._load_state(rows[0])
+        return session
 
-    @property
-    def get_table_name(self) -> str:
-        return self._table_name
+    def sessions(self) -> List[Session]:
+        """Active sessions, oldest first."""
+        if self._shared:
+            self._refresh()
+        return [s for s in self._sessions.values() if s.active]
 
     @property
     def db_path(self) -> str:
@@ -93,18 +447,36 @@ class SessionService:
 
     @property
     def active(self) -> bool:
-        return self._active
+        return any(s.active for s in self._sessions.values())
+
+    @property
+    def shared(self) -> bool:
+        return self._shared
+
+    # ----------------------------
+    # Fill notifications
+    # ----------------------------
+    def add_fill_listener(self, listener: Callable[[Session], None]) -> None:
+        """Called (on the event loop) with each session that reaches capacity."""
+        self._fill_listeners.append(listener)
+
+    def session_filled(self, session: Session) -> None:
+        for listener in self._fill_listeners:
+            listener(session)
 
     # ----------------------------
     # End Session
     # ----------------------------
-    def end_session(self) -> None:
-        self._active = False
-        self._session_id = None
-        self._session_code = None
-        self._table_name = None
-        self._current_count = 0
-        self._db_path = None
+    def end_session(self, code: Optional[str] = None) -> None:
+        """Close one session by code, or every session when no code is given."""
+        with self._lock:
+            targets = list(self._sessions.values()) if code is None else [self._sessions.get(code)]
+            for session in targets:
+                if session is None:
+                    raise KeyError(f"Unknown session code: {code}")
+                session.close()
+                if self._shared:
+                    db_service.close_session_state(session.code)
 
 
-session_service = SessionService()
\ No newline at end of file
+session_service = SessionService()
@@ -0,0 +1,192 @@
+# server/services/snapshot_service.py
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from server.config import settings
+from server.services.db_service import db_service
+
+
+class SnapshotResult:
+    def __init__(
+        self,
+        path: str,
+        method: str,
+        duration: float,
+        max_lock_hold: float,
+        steps: int,
+        restarts: int,
+    ) -> None:
+        self.path = path
+        self.method = method
+        self.duration = duration
+        self.max_lock_hold = max_lock_hold
+        self.steps = steps
+        self.restarts = restarts
+
+    def __str__(self) -> str:
+        return (
+            f"{self.path} via {self.method} in {self.duration:.3f}s "
+            f"({self.steps} steps, {self.restarts} restarts, "
+            f"longest lock hold {self.max_lock_hold * 1000:.1f}ms)"
+        )
+
+
+class SnapshotService:
+    """
+    Consistent copies of the live DB while submissions keep flowing.
+
+    "backup" uses SQLite's online backup API in `pages_per_step`
+    increments, pausing between steps so writers can commit. A backup is
+    restarted by SQLite whenever another connection writes, so after
+    `max_restarts` it falls back to VACUUM INTO, which copies under a
+    single read transaction (non-blocking for writers in WAL mode).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+    # ----------------------------
+    # Snapshot
+    # ----------------------------
+    def snapshot(self, method: Optional[str] = None) -> SnapshotResult:
+        db_path = db_service.db_path
+        if db_path is None:
+            raise RuntimeError("Database not connected")
+        method = method or settings.snapshot_method
+        if method not in ("backup", "vacuum"):
+            raise ValueError(f"Unsupported snapshot method: {method}")
+
+        # Scheduled runs and operator commands come from different threads
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("Snapshot already running")
+        try:
+            return self._snapshot(db_path, method)
+        finally:
+            self._lock.release()
+
+    def _snapshot(self, db_path: str, method: str) -> SnapshotResult:
+        snapshot_dir = Path(settings.snapshot_path)
+        snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+        # Milliseconds keep two snapshots in the same second apart
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")[:-3]
+        target = snapshot_dir / f"{Path(db_path).stem}-{stamp}.db"
+        partial = target.with_suffix(".db.partial")
+        if partial.exists():
+            partial.unlink()
+
+        started = time.perf_counter()
+        source = sqlite3.connect(db_path, timeout=settings.db_timeout)
+        try:
+            if method == "backup":
+                result = self._backup(source, partial)
+                if result is None:
+                    if partial.exists():
+                        partial.unlink()
+                    result = self._vacuum_into(source, partial)
+            else:
+                result = self._vacuum_into(source, partial)
+        finally:
+            source.close()
+
+        os.replace(partial, target)
+        result.path = str(target)
+        # Includes any abandoned backup attempts before a VACUUM INTO fallback
+        result.duration = time.perf_counter() - started
+        return result
+
+    def _backup(self, source: sqlite3.Connection, partial: Path) -> Optional[SnapshotResult]:
+        pages = settings.snapshot_pages_per_step
+        pause = settings.snapshot_step_sleep_ms / 1000.0
+        max_restarts = settings.snapshot_max_restarts
+
+        stats = {"steps": 0, "restarts": 0, "max_hold": 0.0, "remaining": None}
+        step_started = time.perf_counter()
+
+        class _TooManyRestarts(Exception):
+            pass
+
+        def progress(status: int, remaining: int, total: int) -> None:
+            nonlocal step_started
+            hold = time.perf_counter() - step_started
+            stats["steps"] += 1
+            stats["max_hold"] = max(stats["max_hold"], hold)
+
+            # Remaining pages going up means SQLite restarted the copy
+            if stats["remaining"] is not None and remaining > stats["remaining"]:
+                stats["restarts"] += 1
+                if stats["restarts"] > max_restarts:
+                    raise _TooManyRestarts()
+            stats["remaining"] = remaining
+
+            # Step boundary: no lock held, give writers room to commit
+            if remaining and pause:
+                time.sleep(pause)
+            step_started = time.perf_counter()
+
+        started = time.perf_counter()
+        target = sqlite3.connect(str(partial))
+        try:
+            source.backup(target, pages=pages, progress=progress)
+        except _TooManyRestarts:
+            print(f"[Snapshot] Backup restarted {stats['restarts']} times, falling back to VACUUM INTO.")
+            return None
+        finally:
+            target.close()
+
+        return SnapshotResult(
+            path=str(partial),
+            method="backup",
+            duration=time.perf_counter() - started,
+            max_lock_hold=stats["max_hold"],
+            steps=stats["steps"],
+            restarts=stats["restarts"],
+        )
+
+    def _vacuum_into(self, source: sqlite3.Connection, partial: Path) -> SnapshotResult:
+        started = time.perf_counter()
+        source.execute("VACUUM INTO ?;", (str(partial),))
+        duration = time.perf_counter() - started
+
+        # One read transaction for the whole copy
+        return SnapshotResult(
+            path=str(partial),
+            method="vacuum",
+            duration=duration,
+            max_lock_hold=duration,
+            steps=1,
+            restarts=0,
+        )
+
+    # ----------------------------
+    # Async entry points
+    # ----------------------------
+    async def snapshot_async(self, method: Optional[str] = None) -> Optional[SnapshotResult]:
+        """Run a snapshot off the event loop and report the outcome."""
+        try:
+            result = await asyncio.to_thread(self.snapshot, method)
+        except Exception as e:
+            print("[ERROR] Snapshot failed:", e)
+            return None
+        print(f"[Snapshot] Wrote {result}")
+        return result
+
+    async def run_schedule(self) -> None:
+        """Take a snapshot every `snapshot.interval_minutes` (0 disables)."""
+        interval = settings.snapshot_interval_minutes * 60
+        if interval <= 0:
+            return
+        print(f"[Snapshot] Scheduled every {settings.snapshot_interval_minutes} min.")
+        while True:
+            await asyncio.sleep(interval)
+            await self.snapshot_async()
+
+
+snapshot_service = SnapshotService()
@@ -0,0 +1,50 @@
+# server/worker.py
+
+import socket
+import traceback
+from typing import Any, List
+
+from server.app import create_app
+from server.config import settings
+from server.services.asset_service import asset_service
+from server.services.db_service import db_service
+from server.services.killswitch_service import KillSwitchService
+from server.services.session_service import session_service
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    """Listening socket created once in the parent and shared by all workers."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sockets: List[socket.socket], db_path: str, activity: Any) -> None:
+    """
+    Entry point of a spawned worker process.
+
+    Opens its own DB writer, loads the shared session state written by
+    the parent and serves on the inherited socket until SIGTERM.
+    """
+    try:
+        db_service.connect(db_path)
+        session_service.enable_shared_state()
+        asset_service.load()
+    except Exception:
+        print("[ERROR] Worker failed to initialize")
+        traceback.print_exc()
+        raise SystemExit(1)
+
+    import uvicorn # type: ignore
+
+    app = create_app(killswitch=KillSwitchService(activity=activity))
+    config = uvicorn.Config(app, host=settings.server_host, port=settings.server_port)
+    server = uvicorn.Server(config)
+
+    try:
+        server.run(sockets=sockets)
+    finally:
+        db_service.close()
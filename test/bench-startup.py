@@ -0,0 +1,182 @@
+# bench-startup.py
+#
+# Cold-start measurement. Every run is a fresh interpreter, so nothing is
+# shared with the previous one except the OS page cache and __pycache__.
+#
+#   import_main_ms       `import main` (what the launcher pays before parsing args)
+#   import_app_ms        `import server.app`
+#   create_app_ms        create_app(): FastAPI, routes and middleware imported and
+#                        assembled (deferred until the app is actually built)
+#   first_request_ms     process spawn -> first 200 from GET /attendance/ of a
+#                        real `main.py` server (interpreter, imports, DB, session,
+#                        assets, uvicorn startup)
+#
+# Only the standard library is used, so it also runs inside the Docker image:
+#   python test/bench-startup.py
+#   python test/bench-startup.py --runs 10 --report backup/startup.json
+#   python test/bench-startup.py --max-ms 1500        # exit 1 when slower
+#   docker run --rm --entrypoint python3 presenz-image test/bench-startup.py
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# -------------------------
+# Configuration
+# -------------------------
+DEFAULT_RUNS = 5
+READY_TIMEOUT = 30.0
+POLL_INTERVAL = 0.005
+
+# Each snippet prints its own elapsed seconds
+IMPORT_MAIN = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+IMPORT_APP = "import time; t = time.perf_counter(); import server.app; print(time.perf_counter() - t)"
+CREATE_APP = (
+    "import time; from server.app import create_app; t = time.perf_counter(); "
+    "create_app(); print(time.perf_counter() - t)"
+)
+
+
+# -------------------------
+# Helpers
+# -------------------------
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def write_config(workdir: str, port: int) -> str:
+    """Copy of config/config.json pointed at a scratch DB and a free port."""
+    with open(os.path.join(ROOT, "config", "config.json"), "r", encoding="utf-8") as f:
+        config = json.load(f)
+    config["server"]["host"] = "127.0.0.1"
+    config["server"]["port"] = port
+    config["database"]["base_path"] = workdir + os.sep
+    path = os.path.join(workdir, "config.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f)
+    return path
+
+
+def timed_snippet(code: str, env: Dict[str, str]) -> float:
+    """Milliseconds reported by `code` run in a fresh interpreter."""
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return float(out.strip().splitlines()[-1]) * 1000
+
+
+def first_request(env: Dict[str, str], port: int) -> float:
+    """Milliseconds from spawning main.py to its first successful response."""
+    url = f"http://127.0.0.1:{port}/attendance/"
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "main.py", "--course", "bench", "--batch", "startup", "--total", "10"],
+        cwd=ROOT, env=env, stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"main.py exited with {proc.returncode} before serving")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except (urllib.error.URLError, ConnectionError):
+                pass
+            if time.perf_counter() - started > READY_TIMEOUT:
+                raise RuntimeError(f"No response from {url} within {READY_TIMEOUT:.0f}s")
+            time.sleep(POLL_INTERVAL)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "max": max(samples),
+    }
+
+
+# -------------------------
+# Main
+# -------------------------
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Presenz cold-start measurement")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="Fresh processes per measurement")
+    parser.add_argument("--report", help="Write the results as JSON to this path")
+    parser.add_argument("--max-ms", type=float, help="Fail when median time to first request exceeds this")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="presenz-startup-")
+    port = free_port()
+    env = dict(os.environ, CONFIG_PATH=write_config(workdir, port))
+    env.pop("PRESENZ_TEST_HOOKS", None)
+
+    measurements = (
+        ("import_main_ms", lambda: timed_snippet(IMPORT_MAIN, env)),
+        ("import_app_ms", lambda: timed_snippet(IMPORT_APP, env)),
+        ("create_app_ms", lambda: timed_snippet(CREATE_APP, env)),
+        ("first_request_ms", lambda: first_request(env, port)),
+    )
+
+    results: Dict[str, Dict[str, float]] = {}
+    try:
+        # Warm __pycache__ once so every measured run sees the same state
+        timed_snippet(IMPORT_MAIN, env)
+        for name, measure in measurements:
+            print(f"[startup] {name} ...", flush=True)
+            results[name] = summarize([measure() for _ in range(args.runs)])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print("\n+-------------- Startup Results (ms) --------------+")
+    print(f"{'measurement':<20}{'min':>10}{'median':>10}{'max':>10}")
+    for name, stats in results.items():
+        print(f"{name:<20}{stats['min']:>10.1f}{stats['median']:>10.1f}{stats['max']:>10.1f}")
+    print("+---------------------------------------------------+")
+
+    if args.report:
+        os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "runs": args.runs,
+                "results": results,
+            }, f, indent=2)
+        print(f"Report written to {args.report}")
+
+    if args.max_ms is not None:
+        median = results["first_request_ms"]["median"]
+        if median > args.max_ms:
+            print(f"FAIL: time to first request {median:.0f} ms exceeds {args.max_ms:.0f} ms")
+            sys.exit(1)
+        print(f"OK: time to first request {median:.0f} ms within {args.max_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+# bench-suite.py
+#
+# In-process benchmark suite: no sockets, no HTTP client noise. The FastAPI
+# app is driven through httpx's ASGI transport and services are called
+# directly, so a slowdown here is a slowdown in our own code.
+#
+# Benchmarks (throughput, higher is better):
+#   validate_name / validate_roll      calls/s
+#   insert_sync_{wal,rollback}         DBService.insert_attendance, one at a time
+#   insert_async_{wal,rollback}        concurrent insert_attendance_async (group commit)
+#   export_json_{1k,100k,1m}           ExportService.export_json rows/s
+#   submit_e2e                         POST /attendance/submit requests/s
+#
+# Run from the repo root (needs `pip install httpx`):
+#   python test/bench-suite.py --save-baseline        # record this machine's baseline
+#   python test/bench-suite.py                        # compare; exit 1 on regression
+#   python test/bench-suite.py --quick --only export  # smaller sizes, subset
+#
+# Baselines are machine-specific: record one per machine, don't commit it.
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+
+from server.app import create_app  # noqa: E402
+from server.config import settings  # noqa: E402
+from server.security import validate_name, validate_roll  # noqa: E402
+from server.services.db_service import db_service  # noqa: E402
+from server.services.export_service import export_service  # noqa: E402
+from server.services.killswitch_service import KillSwitchService  # noqa: E402
+from server.services.session_service import session_service  # noqa: E402
+
+# -------------------------
+# Configuration
+# -------------------------
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench-baseline.json")
+DEFAULT_THRESHOLD = 0.20  # fail when throughput drops by more than 20%
+REPEATS = 3
+MIN_SECONDS = 0.5
+
+EXPORT_SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+QUICK_EXPORT_SIZES = {"1k": 1_000, "100k": 100_000}
+
+
+# -------------------------
+# Helpers
+# -------------------------
+@contextmanager
+def override(section: str, key: str, value) -> Iterator[None]:
+    """Temporarily change one config value read through `settings`."""
+    config = settings._config[section]
+    previous = config[key]
+    config[key] = value
+    try:
+        yield
+    finally:
+        config[key] = previous
+
+
+@contextmanager
+def fresh_db(workdir: str, name: str, wal: bool) -> Iterator[str]:
+    path = os.path.join(workdir, f"{name}.db")
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    with override("database", "wal_mode", wal):
+        db_service.connect(path)
+        try:
+            yield path
+        finally:
+            db_service.close()
+
+
+def best_rate(fn: Callable[[], int]) -> float:
+    """
+    Best-of-REPEATS throughput; `fn` returns the number of operations it did.
+    Short runs are repeated until MIN_SECONDS so timer noise stays small.
+    """
+    best = 0.0
+    for _ in range(REPEATS):
+        ops = 0
+        started = time.perf_counter()
+        while True:
+            ops += fn()
+            elapsed = time.perf_counter() - started
+            if elapsed >= MIN_SECONDS:
+                break
+        best = max(best, ops / elapsed)
+    return best
+
+
+# -------------------------
+# Benchmarks
+# -------------------------
+def bench_validation(quick: bool) -> Dict[str, float]:
+    number = 20_000 if quick else 100_000
+    results = {}
+    for label, fn, value in (
+        ("validate_name", validate_name, "  John Q. Public  "),
+        ("validate_roll", validate_roll, " abc-123 "),
+    ):
+        def calls(fn=fn, value=value) -> int:
+            for _ in range(number):
+                fn(value)
+            return number
+
+        results[label] = best_rate(calls)
+    return results
+
+
+def bench_inserts(workdir: str, quick: bool) -> Dict[str, float]:
+    sync_rows = 200 if quick else 1_000
+    async_rows = 2_000 if quick else 10_000
+    results = {}
+
+    for label, wal in (("wal", True), ("rollback", False)):
+        with fresh_db(workdir, f"insert-{label}", wal):
+            db_service.create_table("bench")
+            counter = iter(range(10**9))
+
+            def sync_batch() -> int:
+                for _ in range(sync_rows):
+                    db_service.insert_attendance("bench", "John Doe", f"S{next(counter)}")
+                return sync_rows
+
+            async def async_wave() -> None:
+                await asyncio.gather(*(
+                    db_service.insert_attendance_async("bench", "John Doe", f"A{next(counter)}")
+                    for _ in range(async_rows)
+                ))
+
+            def async_batch() -> int:
+                asyncio.run(async_wave())
+                return async_rows
+
+            results[f"insert_sync_{label}"] = best_rate(sync_batch)
+            results[f"insert_async_{label}"] = best_rate(async_batch)
+    return results
+
+
+def bench_export(workdir: str, quick: bool) -> Dict[str, float]:
+    sizes = QUICK_EXPORT_SIZES if quick else EXPORT_SIZES
+    results = {}
+    export_dir = os.path.join(workdir, "export")
+
+    with fresh_db(workdir, "export", True) as path, override("export", "backup_path", export_dir):
+        for label, rows in sizes.items():
+            table = f"export_{label}"
+            db_service.create_table(table)
+
+            # Bulk-load outside the writer; only the export is measured
+            conn = sqlite3.connect(path, timeout=settings.db_timeout)
+            with conn:
+                conn.executemany(
+                    f'INSERT INTO "{table}" (name, roll) VALUES (?, ?);',
+                    (("John Doe", f"R{i}") for i in range(rows)),
+                )
+            conn.close()
+
+            def export() -> int:
+                export_service.export_json(table)
+                return rows
+
+            results[f"export_json_{label}"] = best_rate(export)
+    return results
+
+
+def bench_submit(workdir: str, quick: bool) -> Dict[str, float]:
+    requests = 1_000 if quick else 5_000
+    concurrency = 50
+
+    # Keep the rate limiter in the path but never let it reject
+    with fresh_db(workdir, "submit", True), \
+            override("rate_limit", "ip_burst", 10**9), \
+            override("rate_limit", "session_burst", 10**9):
+        session = session_service.open_session(
+            max_count=10**9, course="bench", batch="e2e", db_filename="submit.db",
+        )
+        app = create_app(killswitch=KillSwitchService())
+        counter = iter(range(10**9))
+
+        async def run() -> None:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                async def worker(count: int) -> None:
+                    for _ in range(count):
+                        response = await client.post("/attendance/submit", json={
+                            "name": "John Doe",
+                            "roll": f"E{next(counter)}",
+                            "session_code": session.code,
+                        })
+                        if response.status_code != 200:
+                            raise RuntimeError(f"Submit failed: {response.status_code} {response.text}")
+
+                await asyncio.gather(*(worker(requests // concurrency) for _ in range(concurrency)))
+
+        def submit_batch() -> int:
+            asyncio.run(run())
+            return requests // concurrency * concurrency
+
+        try:
+            return {"submit_e2e": best_rate(submit_batch)}
+        finally:
+            session_service.end_session(session.code)
+
+
+GROUPS = {
+    "validation": lambda workdir, quick: bench_validation(quick),
+    "insert": bench_inserts,
+    "export": bench_export,
+    "submit": bench_submit,
+}
+
+
+# -------------------------
+# Baseline comparison
+# -------------------------
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    """Names of benchmarks whose throughput fell below baseline * (1 - threshold)."""
+    regressions = []
+    for name, rate in results.items():
+        reference = baseline.get(name)
+        if reference and rate < reference * (1 - threshold):
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Presenz in-process benchmark suite")
+    parser.add_argument("--only", nargs="+", choices=sorted(GROUPS), help="Run only these groups")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes (skips the 1M-row export)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON path")
+    parser.add_argument("--save-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed throughput drop (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="presenz-bench-")
+    results: Dict[str, float] = {}
+    try:
+        for group in args.only or list(GROUPS):
+            print(f"[bench] {group} ...", flush=True)
+            results.update(GROUPS[group](workdir, args.quick))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline: Dict[str, float] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    regressions = [] if args.save_baseline else compare(results, baseline, args.threshold)
+
+    print("\n+------------------- Benchmark Results -------------------+")
+    print(f"{'benchmark':<22}{'ops/s':>14}{'baseline':>14}{'change':>9}")
+    for name, rate in results.items():
+        reference = baseline.get(name)
+        change = f"{(rate / reference - 1) * 100:+.1f}%" if reference else "-"
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"{name:<22}{rate:>14,.0f}{(reference or 0):>14,.0f}{change:>9}{flag}")
+    print("+---------------------------------------------------------+")
+
+    if args.save_baseline:
+        # Keep entries of groups that were not re-run
+        merged = {**baseline, **results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "results": merged,
+            }, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+    elif regressions:
+        print(f"FAIL: {len(regressions)} benchmark(s) dropped more than {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    elif baseline:
+        print(f"OK: no benchmark dropped more than {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# bench-validation.py
+#
+# Microbenchmark: per-request validation cost of the legacy double pass
+# (pydantic model + re-validation in the handler) vs the single-pass
+# AttendanceRequest model.
+#
+# Run from the repo root:  python test/bench-validation.py
+
+import json
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import BaseModel, Field  # noqa: E402
+
+from server.models.schemas import AttendanceRequest  # noqa: E402
+
+# -------------------------
+# Configuration
+# -------------------------
+ITERATIONS = 20000
+REPEATS = 5
+
+BODY = json.dumps({
+    "name": "  John Doe  ",
+    "roll": "abc-123",
+    "session_code": "K7Q2ZP9M",
+}).encode()
+
+
+# -------------------------
+# Legacy pipeline (pre single-pass)
+# -------------------------
+class LegacyAttendanceRequest(BaseModel):
+    name: str = Field(..., min_length=2, max_length=100)
+    roll: str = Field(..., min_length=1, max_length=30)
+    session_code: str = Field(..., min_length=1, max_length=32)
+
+    model_config = {"str_strip_whitespace": True}
+
+
+def legacy_sanitize(value: str) -> str:
+    value = value.strip()
+    return re.sub(r"[\x00-\x1f\x7f]", "", value)
+
+
+def legacy_validate_name(name: str) -> str:
+    name = legacy_sanitize(name)
+    if not (2 <= len(name) <= 100):
+        raise ValueError("length")
+    if not re.fullmatch(r"[A-Za-z.\s]+", name):
+        raise ValueError("charset")
+    return name
+
+
+def legacy_validate_roll(roll: str) -> str:
+    roll = legacy_sanitize(roll)
+    if not (1 <= len(roll) <= 30):
+        raise ValueError("length")
+    if not re.fullmatch(r"[A-Za-z0-9\-]+", roll):
+        raise ValueError("charset")
+    return roll.upper()
+
+
+def legacy_pipeline() -> None:
+    # FastAPI parsed JSON to a dict, then built the model, then the
+    # handler re-sanitized every field
+    payload = LegacyAttendanceRequest(**json.loads(BODY))
+    legacy_validate_name(payload.name)
+    legacy_validate_roll(payload.roll)
+    legacy_sanitize(payload.session_code)
+
+
+def single_pass_pipeline() -> None:
+    AttendanceRequest.model_validate_json(BODY)
+
+
+# -------------------------
+# Runner
+# -------------------------
+def measure(fn) -> float:
+    """Best-of-REPEATS cost per call, in microseconds."""
+    best = min(timeit.repeat(fn, number=ITERATIONS, repeat=REPEATS))
+    return best / ITERATIONS * 1e6
+
+
+def main() -> None:
+    legacy = measure(legacy_pipeline)
+    single = measure(single_pass_pipeline)
+
+    print("+------------- Validation Microbenchmark -------------+")
+    print(f"Iterations      : {ITERATIONS} x {REPEATS}")
+    print(f"Legacy pipeline : {legacy:.2f} us/request")
+    print(f"Single pass     : {single:.2f} us/request")
+    print(f"Speedup         : {legacy / single:.2f}x")
+    print("+-----------------------------------------------------+")
+
+
+if __name__ == "__main__":
+    main()
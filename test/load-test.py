@@ -0,0 +1,356 @@
+# load-test.py
+#
+# Open-loop asyncio load generator for /attendance/submit.
+#
+# Requests are sent on a fixed schedule (constant rate or bursts) no matter
+# how slow the server is, so queueing shows up in the latency numbers
+# instead of silently lowering the offered load. Latency is measured from
+# each request's *scheduled* start; service time from its actual send.
+#
+# Start the server with test hooks so the session code is discovered:
+#   PRESENZ_TEST_HOOKS=1 python3 main.py --course cs50 --batch fall-101 --total 200
+#
+# Then, from the repo root (needs `pip install httpx`):
+#   python test/load-test.py --profile stress
+#   python test/load-test.py --profile duplicate --report backup/dup.json
+#   python test/load-test.py --profile latency --rate 50 --requests 1000 --seed 7
+
+import argparse
+import asyncio
+import json
+import random
+import string
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+# -------------------------
+# Configuration
+# -------------------------
+DEFAULT_URL = "http://localhost:8080"
+SUBMIT_PATH = "/attendance/submit"
+DISCOVERY_PATH = "/attendance/test/session"
+REQUEST_TIMEOUT = 10.0
+
+INVALID_CODES = ["XXXX", "1234ABCD", "INVALID", "ZZZZ9999"]
+
+
+# -------------------------
+# HDR-style latency histogram
+# -------------------------
+class LatencyHistogram:
+    """
+    Log-linear histogram over integer microseconds: exact below 128us,
+    then 64 linear sub-buckets per power of two (~1.6% worst-case error),
+    the same layout HdrHistogram uses. Memory stays bounded however many
+    values are recorded.
+    """
+
+    SUB_BUCKET_BITS = 6
+
+    def __init__(self) -> None:
+        self._counts: Dict[int, int] = {}
+        self.count = 0
+        self.max = 0
+        self.total = 0
+
+    def _bucket(self, value: int) -> int:
+        shift = max(0, value.bit_length() - 1 - self.SUB_BUCKET_BITS)
+        # Lowest value of the bucket, kept as the key
+        return (value >> shift) << shift
+
+    def record(self, seconds: float) -> None:
+        value = max(1, int(seconds * 1_000_000))
+        key = self._bucket(value)
+        self._counts[key] = self._counts.get(key, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the pct-th value, in ms."""
+        if not self.count:
+            return 0.0
+        target = max(1, int(round(self.count * pct / 100.0)))
+        seen = 0
+        for key in sorted(self._counts):
+            seen += self._counts[key]
+            if seen >= target:
+                shift = max(0, key.bit_length() - 1 - self.SUB_BUCKET_BITS)
+                return min(key + (1 << shift) - 1, self.max) / 1000.0
+        return self.max / 1000.0
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count / 1000.0, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50), 3),
+            "p90_ms": round(self.percentile(90), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "p999_ms": round(self.percentile(99.9), 3),
+            "max_ms": round(self.max / 1000.0, 3),
+        }
+
+
+# -------------------------
+# Payloads (seeded, reproducible)
+# -------------------------
+def random_name(rng: random.Random) -> str:
+    first = "".join(rng.choices(string.ascii_letters, k=5))
+    last = "".join(rng.choices(string.ascii_letters, k=5))
+    return f"{first} {last}"
+
+
+def unique_rolls(rng: random.Random, count: int) -> List[str]:
+    rolls: List[str] = []
+    seen = set()
+    while len(rolls) < count:
+        roll = "".join(rng.choices(string.ascii_uppercase + string.digits, k=3)) + "-" + "".join(rng.choices(string.digits, k=3))
+        if roll not in seen:
+            seen.add(roll)
+            rolls.append(roll)
+    return rolls
+
+
+def stress_payloads(rng: random.Random, count: int, code: str) -> List[dict]:
+    return [{"name": random_name(rng), "roll": roll, "session_code": code} for roll in unique_rolls(rng, count)]
+
+
+def duplicate_payloads(rng: random.Random, count: int, code: str) -> List[dict]:
+    return [{"name": "John Doe", "roll": "ABC-123", "session_code": code} for _ in range(count)]
+
+
+def invalid_code_payloads(rng: random.Random, count: int, code: str) -> List[dict]:
+    return [
+        {"name": random_name(rng), "roll": roll, "session_code": rng.choice(INVALID_CODES)}
+        for roll in unique_rolls(rng, count)
+    ]
+
+
+# -------------------------
+# Named profiles (ported from the old interactive test-suite)
+# -------------------------
+# checks: outcome counts -> (passed, description)
+PROFILES: Dict[str, dict] = {
+    "stress": {
+        "description": "Full class submitting within a few seconds",
+        "payloads": stress_payloads,
+        "requests": 200,
+        "arrival": "fixed",
+        "rate": 70.0,
+        "checks": lambda o: (o.get("error", 0) == 0, "no transport errors"),
+    },
+    "latency": {
+        "description": "Steady trickle of students, latency under light load",
+        "payloads": stress_payloads,
+        "requests": 200,
+        "arrival": "fixed",
+        "rate": 20.0,
+        "checks": lambda o: (o.get("error", 0) == 0, "no transport errors"),
+    },
+    "duplicate": {
+        "description": "One roll submitted by everyone at once",
+        "payloads": duplicate_payloads,
+        "requests": 150,
+        "arrival": "burst",
+        "rate": 150.0,
+        "checks": lambda o: (o.get("success", 0) <= 1, "at most one submission accepted"),
+    },
+    "invalid-code": {
+        "description": "Submissions carrying wrong session codes",
+        "payloads": invalid_code_payloads,
+        "requests": 150,
+        "arrival": "fixed",
+        "rate": 50.0,
+        "checks": lambda o: (o.get("success", 0) == 0, "no submission accepted"),
+    },
+}
+
+
+# -------------------------
+# Arrival schedules
+# -------------------------
+def fixed_schedule(count: int, rate: float) -> List[float]:
+    """Offsets in seconds for a constant arrival rate."""
+    return [i / rate for i in range(count)]
+
+
+def burst_schedule(count: int, burst_size: int, burst_interval: float) -> List[float]:
+    """`burst_size` requests at once, every `burst_interval` seconds."""
+    return [(i // burst_size) * burst_interval for i in range(count)]
+
+
+# -------------------------
+# Runner
+# -------------------------
+def classify(response: httpx.Response) -> str:
+    if response.status_code == 200:
+        try:
+            status = response.json().get("status")
+        except ValueError:
+            status = None
+        return "success" if status == "success" else "closed" if status == "closed" else "other"
+    if response.status_code == 409:
+        return "duplicate"
+    if response.status_code in (400, 422):
+        return "invalid"
+    if response.status_code in (429, 503):
+        return "throttled"
+    return f"http_{response.status_code}"
+
+
+async def discover_session_code(client: httpx.AsyncClient) -> str:
+    response = await client.get(DISCOVERY_PATH)
+    if response.status_code == 404:
+        raise SystemExit("Session discovery unavailable: start the server with PRESENZ_TEST_HOOKS=1 or pass --session-code")
+    response.raise_for_status()
+    sessions = response.json()["sessions"]
+    if not sessions:
+        raise SystemExit("No active session on the server")
+    return sessions[-1]["session_code"]
+
+
+def client_ips(count: int, clients: int) -> List[Optional[str]]:
+    """
+    Simulated client address per request, sent as CF-Connecting-IP so the
+    server's per-IP rate limit sees distinct students. clients=0: one per
+    request; otherwise requests cycle through `clients` addresses.
+    """
+    pool = count if clients <= 0 else clients
+    return [f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}" for i in (n % pool for n in range(count))]
+
+
+async def run(
+    url: str,
+    payloads: List[dict],
+    schedule: List[float],
+    ips: List[Optional[str]],
+    timeout: float,
+    progress: Callable[[int], None],
+) -> dict:
+    latency = LatencyHistogram()
+    service = LatencyHistogram()
+    outcomes: Dict[str, int] = {}
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+
+        async def fire(payload: dict, scheduled: float, ip: Optional[str]) -> None:
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            sent = time.perf_counter()
+            try:
+                headers = {"CF-Connecting-IP": ip} if ip else None
+                response = await client.post(SUBMIT_PATH, json=payload, headers=headers)
+                outcome = classify(response)
+            except httpx.HTTPError:
+                outcome = "error"
+            done = time.perf_counter()
+            latency.record(done - scheduled)
+            service.record(done - sent)
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+            progress(sum(outcomes.values()))
+
+        # Every request gets its own task up front: arrivals never wait on responses
+        started = time.perf_counter() + 0.05
+        await asyncio.gather(*(
+            fire(p, started + offset, ip) for p, offset, ip in zip(payloads, schedule, ips)
+        ))
+        duration = time.perf_counter() - started
+
+    return {
+        "duration_s": round(duration, 3),
+        "achieved_rps": round(len(payloads) / duration, 2) if duration > 0 else 0.0,
+        "outcomes": dict(sorted(outcomes.items())),
+        "latency": latency.summary(),
+        "service_time": service.summary(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Presenz open-loop load generator")
+    parser.add_argument("--url", default=DEFAULT_URL, help="Server base URL")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="stress")
+    parser.add_argument("--session-code", help="Skip discovery and use this code")
+    parser.add_argument("--requests", type=int, help="Number of requests (profile default)")
+    parser.add_argument("--arrival", choices=["fixed", "burst"], help="Arrival pattern (profile default)")
+    parser.add_argument("--rate", type=float, help="Requests per second for fixed arrivals")
+    parser.add_argument("--burst-size", type=int, help="Requests per burst (default: all)")
+    parser.add_argument("--burst-interval", type=float, default=1.0, help="Seconds between bursts")
+    parser.add_argument("--seed", type=int, default=1, help="Payload RNG seed")
+    parser.add_argument("--timeout", type=float, default=REQUEST_TIMEOUT, help="Per-request timeout (s)")
+    parser.add_argument("--clients", type=int, default=0, help="Distinct simulated client IPs (0: one per request)")
+    parser.add_argument("--no-client-ips", action="store_true", help="Don't send CF-Connecting-IP")
+    parser.add_argument("--report", help="Write the JSON report to this path")
+    args = parser.parse_args()
+
+    profile = PROFILES[args.profile]
+    count = args.requests or profile["requests"]
+    arrival = args.arrival or profile["arrival"]
+    rate = args.rate or profile["rate"]
+    burst_size = args.burst_size or count
+
+    code = args.session_code
+    if code is None:
+        async def discover() -> str:
+            async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as client:
+                return await discover_session_code(client)
+        code = asyncio.run(discover())
+
+    # Seeded per profile so e.g. stress and latency runs don't share rolls
+    rng = random.Random(f"{args.profile}:{args.seed}")
+    payloads = profile["payloads"](rng, count, code)
+    if arrival == "fixed":
+        schedule = fixed_schedule(count, rate)
+    else:
+        schedule = burst_schedule(count, burst_size, args.burst_interval)
+
+    print(f"\nStarting {args.profile} profile: {profile['description']}")
+    print(f"{count} requests, {arrival} arrivals" + (f" at {rate:g}/s" if arrival == "fixed" else f" of {burst_size}"))
+
+    step = max(1, count // 10)
+
+    def progress(done: int) -> None:
+        if done % step == 0 or done == count:
+            print(f"  {done}/{count} done")
+
+    ips = [None] * count if args.no_client_ips else client_ips(count, args.clients)
+    result = asyncio.run(run(args.url, payloads, schedule, ips, args.timeout, progress))
+
+    passed, description = profile["checks"](result["outcomes"])
+    report = {
+        "profile": args.profile,
+        "url": args.url,
+        "session_code": code,
+        "requests": count,
+        "arrival": arrival,
+        "rate": rate if arrival == "fixed" else None,
+        "burst_size": burst_size if arrival == "burst" else None,
+        "burst_interval_s": args.burst_interval if arrival == "burst" else None,
+        "seed": args.seed,
+        "clients": 1 if args.no_client_ips else (args.clients or count),
+        **result,
+        "check": {"description": description, "passed": passed},
+    }
+
+    lat = result["latency"]
+    print(f"\n+---------------- {args.profile} summary ----------------+")
+    print(f"Outcomes        : {result['outcomes']}")
+    print(f"Achieved rate   : {result['achieved_rps']}/s over {result['duration_s']}s")
+    print(f"Latency (ms)    : p50 {lat['p50_ms']}  p90 {lat['p90_ms']}  p99 {lat['p99_ms']}  max {lat['max_ms']}")
+    print(f"Check           : {description}: {'PASS' if passed else 'FAIL'}")
+    print("+---------------------------------------------------+")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.report}")
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()